@@ -0,0 +1,143 @@
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import time
+from collections import deque
+from datetime import datetime
+from logger import log_message
+from screenshots import writer
+
+# Parts of the HTML that change on every load without the page being different
+VOLATILE_PATTERNS = [
+    (re.compile(r'<script\b.*?</script>', re.S | re.I), ''),
+    (re.compile(r'<style\b.*?</style>', re.S | re.I), ''),
+    (re.compile(r'<!--.*?-->', re.S), ''),
+    (re.compile(r'\svalue="[^"]*"', re.I), ''),  # __VIEWSTATE, tokens and filled inputs
+    (re.compile(r'\s(?:_ngcontent|_nghost)-[\w-]+(?:="[^"]*")?'), ''),
+    (re.compile(r'\b(?:mat|cdk)-[\w-]*?\d+\b'), 'id'),  # Angular Material generated ids
+    (re.compile(r'\d+'), '0'),
+    (re.compile(r'\s+'), ' '),
+    (re.compile(r' ?([<>]) ?'), r'\1'),
+]
+
+def normalize_dom(html):
+    """Strip scripts, generated ids, numbers and whitespace so equivalent pages compare equal"""
+    for pattern, replacement in VOLATILE_PATTERNS:
+        html = pattern.sub(replacement, html)
+    return html.strip()
+
+async def dom_snapshot(page):
+    """HTML of the page and of each of its frames, the iframes being where BonjourSante runs"""
+    parts = []
+    for frame in page.frames:
+        try:
+            parts.append(f"<!-- frame: {frame.url} -->\n{await frame.content()}")
+        except Exception:
+            continue
+    return "\n".join(parts)
+
+class FailureRecorder:
+    """
+    Records the artifacts of a failed attempt, once per distinct failure.
+
+    A DOM snapshot is taken first since it is cheap; failures whose normalized
+    DOM and error match one already recorded only bump a counter. Distinct
+    failures get the HTML, a screenshot and, when "trace_cycles" is set, the
+    Playwright trace chunks of the last cycles, within a per-hour budget.
+    """
+
+    def __init__(self, provider, profile):
+        self.provider = provider
+        self.directory = profile['directory']
+        self.max_per_hour = profile['max_per_hour']
+        self.screenshot = profile['screenshot']
+        self.trace_cycles = profile['trace_cycles']
+        self.seen = {}  # failure hash -> times seen
+        self.recorded = deque()  # times of the artifacts recorded in the last hour
+        self.context = None
+        self.traces = deque()  # paths of the kept trace chunks, oldest first
+        self.trace_directory = None
+        self.cycle = 0
+
+    async def install(self, context):
+        """Start the rolling trace on `context`, once per context"""
+        if not self.trace_cycles or context is self.context:
+            return
+        self.context = context
+        if self.trace_directory is None:
+            self.trace_directory = tempfile.mkdtemp(prefix='meulade_trace_')
+        try:
+            await context.tracing.start(screenshots=True, snapshots=True)
+            await context.tracing.start_chunk()
+        except Exception as e:
+            log_message(f"[{self.provider}] Could not start tracing: {str(e)}")
+            self.context = None
+
+    async def end_cycle(self, label='Cycle'):
+        """Close the trace chunk of the cycle and drop the ones older than the last N cycles"""
+        if self.context is None:
+            return
+        self.cycle += 1
+        path = os.path.join(self.trace_directory, f"cycle_{self.cycle}.zip")
+        try:
+            await self.context.tracing.stop_chunk(path=path)
+            self.traces.append(path)
+            await self.context.tracing.start_chunk()
+        except Exception:
+            self.context = None  # the context is gone, tracing restarts with the next one
+        while len(self.traces) > self.trace_cycles:
+            try:
+                os.remove(self.traces.popleft())
+            except OSError:
+                pass
+
+    def within_budget(self):
+        now = time.monotonic()
+        while self.recorded and now - self.recorded[0] > 3600:
+            self.recorded.popleft()
+        return not self.max_per_hour or len(self.recorded) < self.max_per_hour
+
+    async def record(self, page, error, stage=None):
+        """Save the artifacts of a failure unless it was already recorded or the budget is spent"""
+        if page is None or page.is_closed():
+            return None
+        html = await dom_snapshot(page)
+        error_text = re.sub(r'\d+', '0', f"{type(error).__name__}: {error}".splitlines()[0])
+        digest = hashlib.sha1(f"{stage}\n{error_text}\n{normalize_dom(html)}".encode('utf-8')).hexdigest()[:12]
+
+        count = self.seen.get(digest, 0) + 1
+        self.seen[digest] = count
+        if count > 1:
+            log_message(f"[{self.provider}] Same failure as before ({digest}, seen {count} times), no new artifacts")
+            return None
+        if not self.within_budget():
+            log_message(f"[{self.provider}] Failure artifact budget of {self.max_per_hour}/hour reached, skipping {digest}")
+            return None
+        self.recorded.append(time.monotonic())
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        prefix = f"{self.provider.lower()}_error_{timestamp}_{digest}"
+        writer.save(os.path.join(self.directory, f"{prefix}.html"), html.encode('utf-8'))
+        if self.screenshot:
+            try:
+                await writer.capture(page, self.directory, prefix,
+                               region=writer.profile['region'].get(self.provider.lower()))
+            except Exception as e:
+                log_message(f"Could not capture screenshot: {str(e)}")
+        await self.save_traces(prefix)
+        return digest
+
+    async def save_traces(self, prefix):
+        """Copy the trace chunks of the last cycles, including the failed one, next to the snapshot"""
+        if self.context is None:
+            return
+        await self.end_cycle()
+        os.makedirs(self.directory, exist_ok=True)
+        for index, path in enumerate(self.traces):
+            try:
+                shutil.copyfile(path, os.path.join(self.directory, f"{prefix}_trace_{index}.zip"))
+            except OSError:
+                pass
+        log_message(f"[{self.provider}] Saved the trace of the last {len(self.traces)} cycles")
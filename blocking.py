@@ -0,0 +1,78 @@
+from logger import log_message
+
+# Hosts serving consent banners; blocking them means there is no banner to click
+CONSENT_HOSTS = ('didomi', 'privacy-center.org')
+
+class ResourceFilter:
+    """
+    Route-based filter dropping the resources the automation never needs.
+
+    Installed with context.route on every context a provider uses, it aborts
+    images, fonts, media, analytics and consent widgets (per the "blocking"
+    settings) unless the URL is on the provider's allowlist. Blocked and loaded
+    requests are counted so each cycle can report what was saved.
+    """
+
+    def __init__(self, provider, profile):
+        self.provider = provider
+        self.enabled = profile['enabled']
+        self.resource_types = set(profile['resource_types'])
+        self.blocked_hosts = list(profile['blocked_hosts'])
+        self.allow = list(profile['allow'].get(provider.lower(), []))
+        self.typical_bytes = profile['typical_bytes']
+        self.log_stats = profile['log_stats']
+        self.context = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.blocked = {}  # resource type -> blocked request count
+        self.saved_bytes = 0
+        self.loaded_requests = 0
+        self.loaded_bytes = 0
+
+    async def install(self, context):
+        """Route every request of `context` through the filter, once per context"""
+        if not self.enabled or context is self.context:
+            return
+        self.context = context
+        await context.route('**/*', self.handle)
+        context.on('response', self.on_response)
+
+    def blocks_consent(self):
+        """Whether the consent widget itself is blocked, so its banner will never show"""
+        return self.enabled and any(
+            host in blocked for host in CONSENT_HOSTS for blocked in self.blocked_hosts
+        )
+
+    def should_block(self, url, resource_type):
+        if any(pattern in url for pattern in self.allow):
+            return False
+        if resource_type in self.resource_types:
+            return True
+        return any(host in url for host in self.blocked_hosts)
+
+    async def handle(self, route):
+        request = route.request
+        if self.should_block(request.url, request.resource_type):
+            self.blocked[request.resource_type] = self.blocked.get(request.resource_type, 0) + 1
+            self.saved_bytes += self.typical_bytes.get(request.resource_type, self.typical_bytes['other'])
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def on_response(self, response):
+        self.loaded_requests += 1
+        try:
+            self.loaded_bytes += int(response.headers.get('content-length', 0))
+        except ValueError:
+            pass
+
+    def end_cycle(self, label='Cycle'):
+        """Log the requests and bytes saved since the last report, then start counting again"""
+        if self.enabled and self.log_stats:
+            blocked_count = sum(self.blocked.values())
+            by_type = ", ".join(f"{kind} {count}" for kind, count in sorted(self.blocked.items()))
+            log_message(f"[{self.provider}] {label} blocked {blocked_count} requests (~{self.saved_bytes // 1024} KB saved"
+                        + (f": {by_type}" if by_type else "")
+                        + f"), loaded {self.loaded_requests} requests ({self.loaded_bytes // 1024} KB)")
+        self.reset_stats()
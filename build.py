@@ -23,6 +23,25 @@ command = [
     'meulade.py',
     'gui.py',
     'browser.py',
+    'session.py',
+    'checkpoints.py',
+    'detection.py',
+    'settings.py',
+    'waits.py',
+    'blocking.py',
+    'notifications.py',
+    'screenshots.py',
+    'artifacts.py',
+    'flows.py',
+    'providers.py',
+    'worker.py',
+    'cancellation.py',
+    'supervisor.py',
+    'scheduler.py',
+    'slots.py',
+    'forms.py',
+    'fonts.py',
+    'log_panel.py',
     'languages.py',
     'logger.py',
     '--onefile',
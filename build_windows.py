@@ -75,6 +75,25 @@ def build_windows_exe():
         '--hidden-import=playwright._impl.async_api',
         '--hidden-import=gui',
         '--hidden-import=browser',
+        '--hidden-import=session',
+        '--hidden-import=checkpoints',
+        '--hidden-import=detection',
+        '--hidden-import=settings',
+        '--hidden-import=waits',
+        '--hidden-import=blocking',
+        '--hidden-import=notifications',
+        '--hidden-import=screenshots',
+        '--hidden-import=artifacts',
+        '--hidden-import=flows',
+        '--hidden-import=providers',
+        '--hidden-import=worker',
+        '--hidden-import=cancellation',
+        '--hidden-import=supervisor',
+        '--hidden-import=scheduler',
+        '--hidden-import=slots',
+        '--hidden-import=forms',
+        '--hidden-import=fonts',
+        '--hidden-import=log_panel',
         '--hidden-import=languages',
         '--hidden-import=logger',
         
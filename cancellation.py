@@ -0,0 +1,101 @@
+import asyncio
+import threading
+
+class CancelToken:
+    """
+    Stop and pause signal shared between the command loop and a running search.
+
+    Built on threading.Event so it can be flipped from any thread. It keeps the
+    get()/set() interface of the old search_running flag; on top of that the
+    engine registers on_cancel callbacks to cancel its tasks at once, wherever
+    they are waiting, and awaits wait_if_paused() between steps.
+    """
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self.resumed = threading.Event()
+        self.resumed.set()
+        self.lock = threading.Lock()
+        self.callbacks = []
+        self.waiters = []  # called when a paused search resumes or is cancelled
+
+    def get(self):
+        """Whether the search should keep running"""
+        return not self.cancelled.is_set()
+
+    def set(self, running):
+        if running:
+            self.reset()
+        else:
+            self.cancel()
+
+    def reset(self):
+        """Make the token usable for a new search"""
+        with self.lock:
+            self.cancelled.clear()
+            self.resumed.set()
+            waiters = list(self.waiters)
+        for waiter in waiters:
+            waiter()
+
+    def cancel(self):
+        with self.lock:
+            if self.cancelled.is_set():
+                return
+            self.cancelled.set()
+            self.resumed.set()  # a paused search must wake up to see the cancellation
+            callbacks = list(self.callbacks) + list(self.waiters)
+        for callback in callbacks:
+            callback()
+
+    def pause(self):
+        with self.lock:
+            if not self.cancelled.is_set():
+                self.resumed.clear()
+
+    def resume(self):
+        with self.lock:
+            self.resumed.set()
+            waiters = list(self.waiters)
+        for waiter in waiters:
+            waiter()
+
+    @property
+    def state(self):
+        if self.cancelled.is_set():
+            return 'cancelled'
+        return 'running' if self.resumed.is_set() else 'paused'
+
+    def on_cancel(self, callback):
+        """Call `callback` once the token is cancelled (right away if it already is); returns a remover"""
+        with self.lock:
+            already = self.cancelled.is_set()
+            if not already:
+                self.callbacks.append(callback)
+        if already:
+            callback()
+
+        def remove():
+            with self.lock:
+                if callback in self.callbacks:
+                    self.callbacks.remove(callback)
+        return remove
+
+    def sleep(self, seconds):
+        """Blocking sleep that returns early, with True, when the token is cancelled"""
+        return self.cancelled.wait(seconds)
+
+    async def wait_if_paused(self):
+        """Return at once when running, else once the search is resumed or cancelled, from any thread"""
+        loop = asyncio.get_running_loop()
+        resumed = asyncio.Event()
+        waiter = lambda: loop.call_soon_threadsafe(resumed.set)
+        with self.lock:
+            if self.resumed.is_set():
+                return
+            self.waiters.append(waiter)
+        try:
+            await resumed.wait()
+        finally:
+            with self.lock:
+                self.waiters.remove(waiter)
@@ -0,0 +1,98 @@
+import time
+from logger import log_message
+
+class SessionExpired(Exception):
+    """Raised when a provider sends us back to an earlier stage of its flow"""
+    pass
+
+class PageChanged(Exception):
+    """Raised when a page shows none of the elements or outcomes the flow expects"""
+    pass
+
+class SlotExpired(Exception):
+    """Raised when a slot held for the user was not booked in time and the flow starts over"""
+    pass
+
+class SlotNotWanted(SlotExpired):
+    """Raised when the slots found are all filtered out and the held one is released by starting over"""
+    pass
+
+class SessionCheckpoint:
+    """
+    Last good state of a provider session.
+
+    The flow of a provider is split into named stages, in order. Each time a
+    stage is reached we keep the Playwright storage_state and the page URL, so
+    that after a failure we can resume at the deepest stage that still works
+    instead of replaying the whole form flow.
+    """
+
+    MAX_FAILURES_PER_STAGE = 3  # give up on the checkpoint and start over after this many failures
+
+    def __init__(self, provider, stages):
+        self.provider = provider
+        self.stages = list(stages)
+        self.stage = None
+        self.url = None
+        self.storage_state = None
+        self.saved_at = None
+        self.failures = 0
+        self.failed_stage = None
+
+    async def reached(self, stage, page):
+        """Record that the flow reached `stage` on `page`"""
+        self.stage = stage
+        self.url = page.url
+        try:
+            self.storage_state = await page.context.storage_state()
+        except Exception:
+            # Keep the previous storage state if the context is already going away
+            pass
+        self.saved_at = time.time()
+
+    def succeeded(self):
+        """Reset the failure streak once a resumed stage did useful work"""
+        self.failures = 0
+        self.failed_stage = None
+
+    def failed(self, stage):
+        """
+        Record a failure while running `stage`; returns whether the checkpoint was dropped.
+
+        Repeated failures at the same stage drop the checkpoint, the session is
+        then rebuilt from scratch: the steps of an earlier stage cannot be
+        replayed on the page the failing stage left behind.
+        """
+        if stage == self.failed_stage:
+            self.failures += 1
+        else:
+            self.failed_stage = stage
+            self.failures = 1
+
+        if self.failures >= self.MAX_FAILURES_PER_STAGE and self.stage is not None:
+            log_message(f"[{self.provider}] Stage '{stage}' keeps failing, starting over in a new session")
+            self.reset()
+            return True
+        return False
+
+    def reset(self):
+        """Forget everything, the next pass starts from the first stage"""
+        self.stage = None
+        self.url = None
+        self.storage_state = None
+        self.saved_at = None
+        self.failures = 0
+        self.failed_stage = None
+
+    def index(self, stage):
+        return self.stages.index(stage)
+
+    def deepest(self, stage):
+        """The shallower of `stage` and the checkpointed stage"""
+        if self.stage is None or stage is None:
+            return self.stages[0]
+        return self.stages[min(self.index(stage), self.index(self.stage))]
+
+    def stages_from(self, stage):
+        """Stage names to run, in order, when resuming at `stage`"""
+        return self.stages[self.index(stage):]
@@ -0,0 +1,118 @@
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+import logger
+from logger import log_message
+from cancellation import CancelToken
+from settings import load_settings
+from providers import FLOWS
+
+# Exit codes
+EXIT_SLOT = 0  # a slot was booked, or found where it is not booked
+EXIT_ERROR = 1  # unusable config, or the search failed to start
+EXIT_NO_SLOT = 2  # stopped (Ctrl+C, --timeout) before any slot
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Search for appointments without the window: headless browser, results on stdout and in the log.")
+    parser.add_argument('--config', default='config.json', help="config file written by the app (default: config.json)")
+    parser.add_argument('--providers', help=f"comma separated, among {', '.join(FLOWS)} (default: the 'providers' setting)")
+    parser.add_argument('--autobook', action='store_true', help="book the first slot found where the provider allows it")
+    parser.add_argument('--keep-going', action='store_true', help="keep searching after a slot is found")
+    parser.add_argument('--timeout', type=float, help="give up after this many minutes")
+    parser.add_argument('--show-browser', action='store_true', help="run the browser with its window")
+    parser.add_argument('--verbose', action='store_true', help="also print [DEBUG] lines")
+    return parser.parse_args(argv)
+
+def load_config(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    if not isinstance(config.get('personal_info'), dict):
+        raise ValueError("no \"personal_info\" section")
+    missing = [field for field, value in config['personal_info'].items() if not value]
+    if missing:
+        raise ValueError(f"empty fields: {', '.join(missing)}")
+    return config
+
+def print_record(record, verbose):
+    if record.level != 'debug' or verbose:
+        stamp = time.strftime('%H:%M:%S', time.localtime(record.time))
+        print(f"{stamp} {record.text().strip()}", flush=True)
+
+def main(argv=None):
+    """
+    Headless entry point: read the config, search the providers, report on stdout.
+
+    Never imports pygame. Slots and bookings are printed as 'SLOT <provider>'
+    and 'BOOKED <provider>' lines, everything else goes to stdout and the
+    search log file; the exit code tells how the search ended.
+    """
+    args = parse_args(argv)
+    try:
+        config = load_config(args.config)
+        settings = load_settings(config)
+        providers = args.providers.split(',') if args.providers else settings['providers']
+        unknown = [provider for provider in providers if provider not in FLOWS]
+        if unknown:
+            raise ValueError(f"unknown providers: {', '.join(unknown)}")
+    except (OSError, ValueError) as e:
+        print(f"Error: cannot use {args.config}: {str(e)}", file=sys.stderr)
+        return EXIT_ERROR
+
+    try:
+        import flows
+        from screenshots import writer
+        from worker import run_search
+    except ImportError as e:
+        print(f"Error: {str(e)}, install the requirements first", file=sys.stderr)
+        return EXIT_ERROR
+
+    token = CancelToken()
+    found = []  # (event, provider), 'SLOT' events only for the slots not being booked
+    logger.listeners.append(lambda record: print_record(record, args.verbose))
+
+    def on_slot(provider, booking):
+        print(f"SLOT {provider} {time.strftime('%Y-%m-%d %H:%M:%S')}", flush=True)
+        # A slot being booked only counts once booked, the provider then stops the search itself.
+        # Without --autobook, for a provider that cannot book, or with autobook turned off
+        # because of unusable booking data, the slot is the outcome.
+        if not booking:
+            found.append(('SLOT', provider))
+            if not args.keep_going:
+                token.cancel()
+
+    def on_booked(provider):
+        found.append(('BOOKED', provider))
+        print(f"BOOKED {provider} {time.strftime('%Y-%m-%d %H:%M:%S')}", flush=True)
+
+    flows.slot_listeners.append(on_slot)
+    flows.booking_listeners.append(on_booked)
+
+    payload = {'config': config, 'providers': providers, 'autobook': args.autobook,
+               'testing_mode': False, 'headless': not args.show_browser}
+    search = threading.Thread(target=run_search, args=(payload, token, queue.Queue()), name='search', daemon=True)
+    log_message(f"[CLI] Searching {', '.join(providers)}" + (" with autobook" if args.autobook else ""))
+    search.start()
+
+    deadline = time.monotonic() + args.timeout * 60 if args.timeout else None
+    try:
+        while search.is_alive():
+            search.join(0.5)
+            if deadline is not None and time.monotonic() > deadline:
+                log_message("[CLI] Timeout reached, stopping the search")
+                break
+    except KeyboardInterrupt:
+        log_message("[CLI] Interrupted, stopping the search")
+    finally:
+        token.cancel()
+        search.join(10)
+        # The screenshots are written by a daemon thread, let it finish before exiting
+        writer.wait()
+
+    return EXIT_SLOT if found else EXIT_NO_SLOT
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,392 @@
+import asyncio
+import enum
+import json
+import time
+from logger import log_message
+
+class SlotState(enum.Enum):
+    SLOT_FOUND = 'slot_found'
+    NO_SLOTS = 'no_slots'
+    SERVER_ERROR = 'server_error'
+    SESSION_EXPIRED = 'session_expired'
+    UNKNOWN = 'unknown'
+
+class SlotResult:
+    """Outcome of one search cycle, however it was detected"""
+
+    def __init__(self, state, slots=None, source='dom', url=None, digest=None):
+        self.state = state
+        self.slots = slots or []
+        self.source = source
+        self.url = url
+        self.digest = digest  # hash of the results region, equal digests mean unchanged results
+        self.received_at = time.time()
+
+    def __repr__(self):
+        return f"SlotResult({self.state.name}, slots={len(self.slots)}, source={self.source})"
+
+# Keys under which availability APIs list their slots (substring match, lowercase)
+AVAILABILITY_KEYS = ('availabilit', 'disponibilit', 'slots', 'walkin', 'timeslot', 'plagehoraire')
+
+def is_availability_list(key, value):
+    """A list of records under an availability-looking key; lists of names or codes are settings, not slots"""
+    return (isinstance(value, list) and all(isinstance(entry, dict) for entry in value) and
+            any(token in str(key).lower() for token in AVAILABILITY_KEYS))
+
+def find_availability_lists(payload, depth=0):
+    """Every list of records found under an availability-looking key, searched recursively"""
+    found = []
+    if depth > 6:
+        return found
+    if isinstance(payload, dict):
+        for key, value in payload.items():
+            if is_availability_list(key, value):
+                found.append(value)
+            elif isinstance(value, (dict, list)):
+                found.extend(find_availability_lists(value, depth + 1))
+    elif isinstance(payload, list):
+        for item in payload:
+            if isinstance(item, (dict, list)):
+                found.extend(find_availability_lists(item, depth + 1))
+    return found
+
+def parse_availability_payload(payload, url=None):
+    """
+    Turn a decoded availability API payload into a SlotResult.
+
+    The providers do not document their APIs, so this looks for lists under
+    availability-looking keys rather than a fixed schema. A payload without any
+    such list is UNKNOWN, letting the caller fall back to DOM detection.
+    """
+    lists = find_availability_lists(payload)
+    if not lists:
+        return SlotResult(SlotState.UNKNOWN, source='network', url=url)
+    slots = [slot for entries in lists for slot in entries]
+    state = SlotState.SLOT_FOUND if slots else SlotState.NO_SLOTS
+    return SlotResult(state, slots=slots, source='network', url=url)
+
+class PushSource:
+    """
+    Base of the push detection sources: keeps the latest result and hands
+    every new one to the `listeners` (called on the event loop with the
+    source and the result) the moment it arrives.
+    """
+
+    def __init__(self):
+        self.listeners = []
+        self.reset()
+
+    def reset(self):
+        """Forget previous results, e.g. when a session is resumed"""
+        self.latest = None
+        self.seq = 0
+
+    def push(self, result):
+        self.latest = result
+        self.seq += 1
+        for listener in list(self.listeners):
+            listener(self, result)
+
+class AvailabilityWatcher(PushSource):
+    """
+    Event-driven slot detection from the availability API responses a page already fetches.
+
+    Attached with page.on("response"), it parses every matching JSON response
+    as it arrives, so the result of a search is known as soon as the data is
+    received instead of after the results are rendered and scraped.
+    """
+
+    def __init__(self, provider, url_patterns):
+        self.provider = provider
+        self.url_patterns = list(url_patterns)
+        self.page = None
+        super().__init__()
+
+    async def attach(self, page):
+        if self.page is not None:
+            self.detach()
+        self.page = page
+        self.reset()
+        page.on('response', self.on_response)
+        return self
+
+    def detach(self):
+        if self.page is not None:
+            try:
+                self.page.remove_listener('response', self.on_response)
+            except Exception:
+                pass
+            self.page = None
+
+    def matches(self, response):
+        """Whether `response` comes from one of the provider's availability endpoints"""
+        if response.request.resource_type not in ('xhr', 'fetch'):
+            return False
+        url = response.url
+        return any(pattern in url for pattern in self.url_patterns)
+
+    async def parse(self, response):
+        if response.status >= 500:
+            return SlotResult(SlotState.SERVER_ERROR, source='network', url=response.url)
+        try:
+            payload = await response.json()
+        except Exception:
+            return SlotResult(SlotState.UNKNOWN, source='network', url=response.url)
+        return parse_availability_payload(payload, url=response.url)
+
+    async def on_response(self, response):
+        if not self.matches(response):
+            return
+        try:
+            result = await self.parse(response)
+        except Exception as e:
+            log_message(f"[{self.provider}] Could not read availability response: {str(e)}")
+            return
+        self.push(result)
+
+
+# Shared by the classifier and the observer: builds classify() and digest()
+# for a set of rules inside the page
+CLASSIFY_FUNCTIONS_JS = """
+const makeClassifier = (rules) => {
+    const normalize = (text) => (text || '').replace(/\\s+/g, ' ').trim();
+    const visible = (el) => !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+    const anyVisible = (selectors) => selectors.some(
+        (selector) => Array.from(document.querySelectorAll(selector)).some(visible));
+    const anyPresent = (selectors) => selectors.some((selector) => document.querySelector(selector) !== null);
+    const matches = (rule, texts) => {
+        return anyVisible(rule.visible || [])
+            || anyPresent(rule.present || [])
+            || (rule.text || []).some((text) => texts.shown().includes(normalize(text)))
+            || (rule.content || []).some((text) => texts.content().includes(normalize(text)))
+            || (rule.text_in || []).some(([selector, text]) => Array.from(document.querySelectorAll(selector))
+                .some((el) => normalize(el.textContent).includes(normalize(text))));
+    };
+    // Page texts read at most once per classification, innerText forces a layout
+    const pageTexts = () => {
+        let shown = null, content = null;
+        return {
+            shown: () => (shown === null ? (shown = normalize(document.body.innerText)) : shown),
+            content: () => (content === null ? (content = normalize(document.documentElement.textContent)) : content),
+        };
+    };
+    const classify = () => {
+        if (!document.body) {
+            return 'UNKNOWN';
+        }
+        const ready = !rules.ready || anyVisible([rules.ready]);
+        const texts = pageTexts();
+        for (const [state, rule] of rules.states) {
+            if ((ready || rule.ignore_ready) && matches(rule, texts)) {
+                return state;
+            }
+        }
+        return 'UNKNOWN';
+    };
+    const region = () => (rules.region || []).map((selector) => document.querySelector(selector)).find(Boolean)
+        || document.body;
+    const digest = () => {
+        const text = normalize(region().innerText);
+        let hash = 5381;
+        for (let i = 0; i < text.length; i++) {
+            hash = ((hash << 5) + hash + text.charCodeAt(i)) | 0;
+        }
+        return (hash >>> 0).toString(16) + ':' + text.length;
+    };
+    return {classify, digest, region};
+};
+"""
+
+# Injected classifier: waits in the page until one of the rules matches (or the
+# timeout expires) and returns the state with a digest of the results region,
+# so a whole result check costs a single evaluate round trip.
+CLASSIFIER_JS = """
+async ({rules, timeout}) => {
+""" + CLASSIFY_FUNCTIONS_JS + """
+    const {classify, digest} = makeClassifier(rules);
+    const deadline = Date.now() + timeout;
+    let state = classify();
+    while (state === 'UNKNOWN' && Date.now() < deadline) {
+        await new Promise((resolve) => setTimeout(resolve, 100));
+        state = classify();
+    }
+    return {state, digest: digest()};
+}
+"""
+
+# Classification rules, checked in order; 'ready' must be visible before any
+# rule without 'ignore_ready' can match
+RVSQ_RULES = {
+    'ready': None,
+    'region': ['#clinicsWithDisponibilities', '#clinicsWithNoDisponibilities', 'form'],
+    'states': [
+        ['NO_SLOTS', {
+            'visible': ['#clinicsWithNoDisponibilities'],
+            'text': ['Aucun rendez-vous rpondant',
+                     "Aucun rendez-vous répondant à vos critères de recherche n'est disponible pour le moment."],
+        }],
+        ['SLOT_FOUND', {
+            'text': ['Les cliniques suivantes offrent des disponibilités pour votre rendez-vous :'],
+        }],
+    ],
+}
+
+BONJOURSANTE_RULES = {
+    'ready': 'div.title-criteria-container',
+    'region': ['app-search-results', 'main', 'body'],
+    'states': [
+        ['SESSION_EXPIRED', {'visible': ['input#healthInsuranceNumber'], 'ignore_ready': True}],
+        ['SLOT_FOUND', {
+            'present': ['app-locked-walkin-availability[data-test="locked-walkin-availability"]'],
+            'content': ['Consultation réservée pour vous'],
+        }],
+        ['SERVER_ERROR', {'present': ['div.t-alert-content']}],
+        ['NO_SLOTS', {'text_in': [['span.label-message', 'Aucun rendez-vous ne correspond à vos critères de recherche']]}],
+    ],
+}
+
+async def classify_page(target, rules, timeout=30000):
+    """
+    Classify the page or iframe behind `target` with a single evaluate.
+
+    `target` is any locator inside the document to classify, typically its
+    body (page.locator('body') or frame_locator.locator('body')).
+    """
+    outcome = await target.evaluate(CLASSIFIER_JS, {'rules': rules, 'timeout': timeout})
+    return SlotResult(SlotState[outcome['state']], digest=outcome['digest'])
+
+
+# Init script run in every frame: a MutationObserver classifies the document
+# whenever it changes and pushes new outcomes to Python through the binding.
+# An outcome is pushed again when the results region is replaced, even with
+# the same content, so every new search gets its own report.
+OBSERVER_JS = """
+(() => {
+    if (window.__meuladeObserver) {
+        return;
+    }
+    const rules = %(rules)s;
+""" + CLASSIFY_FUNCTIONS_JS + """
+    const {classify, digest, region} = makeClassifier(rules);
+    let lastState = 'UNKNOWN', lastDigest = null, lastRegion = null, scheduled = false;
+    const check = () => {
+        scheduled = false;
+        const state = classify();
+        if (state === 'UNKNOWN') {
+            lastState = state;
+            return;
+        }
+        const currentDigest = digest();
+        const currentRegion = region();
+        if (state !== lastState || currentDigest !== lastDigest || currentRegion !== lastRegion) {
+            lastState = state;
+            lastDigest = currentDigest;
+            lastRegion = currentRegion;
+            window.%(binding)s(state, currentDigest);
+        }
+    };
+    const schedule = () => {
+        // Coalesce bursts of mutations into a single classification
+        if (!scheduled) {
+            scheduled = true;
+            setTimeout(check, 50);
+        }
+    };
+    const start = () => {
+        window.__meuladeObserver = new MutationObserver(schedule);
+        window.__meuladeObserver.observe(document.documentElement,
+                                         {childList: true, subtree: true, characterData: true, attributes: true});
+        schedule();
+    };
+    if (document.documentElement) {
+        start();
+    } else {
+        document.addEventListener('DOMContentLoaded', start);
+    }
+})();
+"""
+
+class SlotObserver(PushSource):
+    """
+    Push-based detection with an in-page MutationObserver.
+
+    The observer runs in the page and every frame (including the BonjourSante
+    hub iframe) and calls back into Python through expose_binding as soon as
+    the classification of the document changes, e.g. the moment a walk-in
+    availability or the clinic availability section appears.
+    """
+
+    BINDING = '__meuladeReport'
+
+    def __init__(self, provider, rules):
+        self.provider = provider
+        self.script = OBSERVER_JS % {'rules': json.dumps(rules), 'binding': self.BINDING}
+        self.page = None
+        super().__init__()
+
+    async def attach(self, page):
+        """Expose the binding and inject the observer, once per page"""
+        if page is self.page:
+            self.reset()
+            return self
+        self.page = page
+        self.reset()
+        await page.expose_binding(self.BINDING, self.on_report)
+        await page.add_init_script(script=self.script)
+        # The init script only runs on future navigations, cover the frames already loaded
+        for frame in page.frames:
+            try:
+                await frame.evaluate(self.script)
+            except Exception:
+                pass
+        return self
+
+    def on_report(self, source, state, digest):
+        result = SlotResult(SlotState[state], source='observer', digest=digest)
+        if result.state is SlotState.SLOT_FOUND:
+            log_message(f"[{self.provider}] Slot pushed by the page observer")
+        self.push(result)
+
+def make_sources(provider, key, detection, rules):
+    """Push-based detection sources enabled in the "detection" settings, observer first"""
+    sources = []
+    if detection['observer']:
+        sources.append(SlotObserver(provider, rules))
+    if detection['mode'] == 'network':
+        sources.append(AvailabilityWatcher(provider, detection['url_patterns'][key]))
+    return sources
+
+def first_result(sources, marks):
+    """First usable result pushed by any of `sources` since `marks` (their `seq` at some earlier point)"""
+    for source, mark in zip(sources, marks):
+        if source.seq > mark and source.latest.state is not SlotState.UNKNOWN:
+            return source.latest
+    return None
+
+async def wait_for_first_result(page, sources, marks, timeout=30000):
+    """
+    First usable result pushed by any of `sources` since `marks` (their `seq` before the search).
+
+    Sleeps until a source pushes something rather than polling them. Returns
+    None when nothing usable arrived within `timeout` ms, so the caller can
+    fall back to classifying the page itself.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout / 1000
+    arrived = asyncio.Event()
+    wake = lambda source, result: arrived.set()
+    for source in sources:
+        source.listeners.append(wake)
+    try:
+        result = first_result(sources, marks)
+        while result is None and loop.time() < deadline:
+            arrived.clear()
+            try:
+                await asyncio.wait_for(arrived.wait(), deadline - loop.time())
+            except asyncio.TimeoutError:
+                pass
+            result = first_result(sources, marks)
+        return result
+    finally:
+        for source in sources:
+            source.listeners.remove(wake)
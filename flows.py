@@ -0,0 +1,640 @@
+import asyncio
+import json
+import time
+from logger import log_message
+from session import BrowserManager
+from checkpoints import SessionCheckpoint, SessionExpired, PageChanged, SlotExpired, SlotNotWanted
+from detection import SlotState, classify_page, make_sources, wait_for_first_result
+from settings import load_settings
+from waits import WaitPolicy
+from blocking import ResourceFilter
+from notifications import dispatcher
+from screenshots import writer
+from artifacts import FailureRecorder
+from supervisor import Supervisor
+from scheduler import PollScheduler
+from forms import fill_form
+from slots import SlotRecord, extract_slots, record_from_payload, matches_preferences, seen_slots
+
+# Actions followed by the politeness 'action' delay unless the step says otherwise
+PAUSED_ACTIONS = ('fill', 'fill_form', 'select', 'check', 'evaluate')
+SLOWEST_STEPS = 3  # steps listed in the timing log of each cycle
+BOOKING_ATTEMPTS = 2  # failed autobookings of a slot before it goes to the seen-slot index
+# Called with the provider key and whether the provider is booking it whenever a slot
+# is found, and with the provider key when one is booked
+slot_listeners = []
+booking_listeners = []
+
+def load_strategies(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_strategies(path, strategies):
+    try:
+        with open(path, 'w') as f:
+            json.dump(strategies, f, indent=2)
+    except OSError as e:
+        log_message(f"Could not save the booking strategies: {str(e)}")
+
+def field_steps(steps):
+    """Steps taking their value from personal_info, including those nested in first_of and branch"""
+    for step in steps:
+        if isinstance(step, list):
+            yield from field_steps(step)
+            continue
+        if 'field' in step:
+            yield step
+        yield from field_steps(step.get('fields', []))
+        yield from field_steps(step.get('steps', []))
+        for option in step.get('options', []):
+            yield from field_steps(option.get('steps', []))
+
+async def slot_found(page, provider, name, booking=False):
+    """
+    Tell the user about a slot without holding up the automation thread.
+
+    `provider` is the key of the flow, `name` the provider as logged. The
+    alert runs on the notification dispatcher and the screenshot is only
+    captured here, then encoded and written by the screenshot writer; a slot
+    being autobooked skips the capture to book first. The listeners are told
+    last, as they may stop the search, which cancels this task.
+    """
+    log_message("🎉 SLOT FOUND! 🎉", provider=name)
+    dispatcher.slot_alert()
+    if not booking:
+        await take_screenshot(page, provider, "screenshots", "slot_found")
+    for listener in slot_listeners:
+        listener(provider, booking)
+
+async def take_screenshot(page, provider, directory, prefix):
+    """Queue a screenshot of `page`, limited to the provider's results region if one is configured"""
+    try:
+        return await writer.capture(page, directory, prefix, region=writer.profile['region'].get(provider))
+    except Exception as e:
+        log_message(f"Could not capture screenshot: {str(e)}")
+
+class FlowRunner:
+    """
+    Runs the declarative description of a provider (see providers.py).
+
+    Every provider gets the same session handling: one context per attempt
+    on the shared browser, resource blocking, push detection sources, failure
+    artifacts, checkpoints to resume from, and timing of every step.
+    """
+
+    def __init__(self, flow, config, search_running, autobook=False, manager=None,
+                 testing_mode=False, testing_delay=0):
+        self.flow = flow
+        self.name = flow['name']
+        self.key = flow['key']
+        self.search_running = search_running
+        self.autobook = autobook
+        self.manager = manager
+        self.personal_info = config['personal_info']
+        self.values = {}  # (field, format) -> value, formatted once per search
+        self.stages = {stage['name']: stage for stage in flow['stages']}
+
+        settings = load_settings(config)
+        writer.configure(settings['screenshots'])
+        self.detection = settings['detection']
+        self.sources = make_sources(self.name, self.key, self.detection, flow['rules'])
+        # Set when the page observer pushes a slot, cutting the wait for the next search short
+        self.pushed = asyncio.Event()
+        for source in self.sources:
+            source.listeners.append(self.on_push)
+        self.policy = WaitPolicy(self.name, settings, testing_mode, testing_delay)
+        self.resource_filter = ResourceFilter(self.name, settings['blocking'])
+        self.recorder = FailureRecorder(self.name, settings['artifacts'])
+        self.supervisor = Supervisor(self.name, settings['supervisor'])
+        self.scheduler = PollScheduler(self.name, self.key, settings['polling'], self.policy)
+        self.preferences = settings['preferences']
+        self.strategies_path = settings['booking']['strategies']
+        self.strategies = load_strategies(self.strategies_path)  # 'provider/step' -> index of the alternative
+        self.seen = seen_slots(settings['seen_slots']['path'], settings['seen_slots']['ttl'])
+        self.booking_failures = {}  # slot key -> failed autobookings
+        self.checkpoint = SessionCheckpoint(self.name, list(self.stages) + ['results'])
+        self.policy.cycle_listeners.extend([self.resource_filter.end_cycle, self.recorder.end_cycle, self.end_cycle])
+
+        # Flags steps can depend on with 'if' / 'unless'
+        self.state = {'consent_blocked': self.resource_filter.blocks_consent()}
+        self.timings = {}  # 'stage/step' -> seconds spent in the current cycle
+
+    def log(self, message, **context):
+        """Log a message of this provider; `context` takes the level, stage and duration of log_message"""
+        log_message(f"[{self.name}] {message}", provider=self.name, **context)
+
+    async def run(self):
+        """Run attempts until the search stops, resuming from the checkpoints after failures"""
+        dispatcher.start()
+        self.prepare_booking()
+        page = None
+        try:
+            while self.search_running.get():
+                stage = self.checkpoint.stages[0]
+                delay = 0
+                try:
+                    self.policy.reset_cycle()
+                    page, stage = await self.resume(page)
+                    await self.check_consent(page.context)
+                    await self.resource_filter.install(page.context)
+                    await self.recorder.install(page.context)
+                    for source in self.sources:
+                        await source.attach(page)
+                    for stage in self.checkpoint.stages_from(stage):
+                        if self.flow['resumable']:
+                            await self.checkpoint.reached(stage, page)
+                        if stage == 'results':
+                            await self.policy.end_cycle('Setup')
+                            await self.search(page)
+                        else:
+                            with self.policy.step(stage):
+                                await self.run_stage(page, stage)
+
+                except SlotExpired as e:
+                    # Not a failure: the held slot goes away with the session, start over from scratch
+                    self.log(f"{str(e)}, starting over", stage=stage)
+                    self.checkpoint.reset()
+                    await self.manager.release(self.name)
+                    page = None
+                    delay = self.supervisor.failed(e, stage)
+                except Exception as e:
+                    log_message(f"\n[ERROR] [{self.name}] An error occurred: {str(e)}", provider=self.name,
+                                level='error', stage=stage)
+                    dropped = self.checkpoint.failed(stage)
+                    await self.recorder.record(page, e, stage)
+                    if dropped:
+                        await self.manager.release(self.name)
+                        page = None
+                    delay = self.supervisor.failed(e, stage)
+                finally:
+                    if not self.flow['resumable']:
+                        await self.manager.release(self.name)
+                        page = None
+                if delay:
+                    await asyncio.sleep(delay)
+        finally:
+            # Also reached when the task is cancelled
+            await self.manager.close_context(self.name)
+
+    async def resume(self, page):
+        """
+        Pick the page and the stage to start the next attempt from.
+
+        Flows that are not resumable always start over in a fresh context.
+        Otherwise the current page is reused when the browser is still alive,
+        or a context is restored from the checkpoint's storage_state and URL;
+        landing back on the flow's 'session_stage' after having gone further
+        is an expired session, redone on the same page.
+        """
+        first = self.checkpoint.stages[0]
+        if not self.flow['resumable'] or self.checkpoint.stage is None:
+            self.log("Creating new context...")
+            return await self.manager.new_page(self.name), first
+
+        if page is None or page.is_closed() or not self.manager.is_alive(self.name):
+            self.log(f"Restoring session from checkpoint '{self.checkpoint.stage}'...")
+            page = await self.manager.new_page(self.name, storage_state=self.checkpoint.storage_state)
+            await self.policy.goto(page, self.checkpoint.url)
+
+        visible_stage = await self.probe_stage(page)
+        session_stage = self.flow.get('session_stage')
+        if (visible_stage == session_stage and
+                self.checkpoint.index(self.checkpoint.stage) > self.checkpoint.index(session_stage)):
+            self.log("Session expired, identifying again without relaunching...")
+
+        stage = self.checkpoint.deepest(visible_stage)
+        if stage == first:
+            # Nothing left to resume, rebuild the session from an empty context
+            self.checkpoint.reset()
+            self.log("Creating new context...")
+            return await self.manager.new_page(self.name), stage
+
+        self.log(f"Resuming at stage '{stage}'...")
+        return page, stage
+
+    async def check_consent(self, context):
+        """Set 'consent_stored' when the context already has one of the flow's 'consent_cookies'"""
+        patterns = [pattern.lower() for pattern in self.flow.get('consent_cookies', [])]
+        stored = bool(patterns) and any(pattern in cookie['name'].lower()
+                                        for cookie in await context.cookies() for pattern in patterns)
+        if stored and not self.state.get('consent_stored'):
+            self.log("Cookie consent already stored, skipping the banner")
+        self.state['consent_stored'] = stored
+
+    async def probe_stage(self, page):
+        """
+        Deepest stage the page is currently showing, from the flow's 'probes'.
+
+        Only uses immediate visibility checks so probing a broken page is cheap.
+        """
+        first = self.checkpoint.stages[0]
+        frame = self.flow.get('frame')
+        if frame:
+            try:
+                await self.policy.wait_for_selector(page, frame, 'iframe')
+            except Exception:
+                return first
+
+        scope = self.scope(page, frame)
+        try:
+            for stage, selectors in self.flow.get('probes', []):
+                for selector in selectors:
+                    if await scope.locator(selector).is_visible():
+                        return stage
+        except Exception:
+            pass
+        return first
+
+    def scope(self, page, frame=None):
+        """Where selectors are looked up: the page, or the frame matching `frame`"""
+        return page.frame_locator(frame) if frame else page
+
+    async def run_stage(self, page, stage):
+        spec = self.stages[stage]
+        await self.run_steps(page, self.scope(page, spec.get('frame')), spec['steps'], stage)
+
+    def flags(self, names):
+        return [self.state.get(name) for name in ([names] if isinstance(names, str) else names)]
+
+    def applies(self, step):
+        """Whether all the 'if' flags of the step are set and none of its 'unless' flags"""
+        if 'if' in step and not all(self.flags(step['if'])):
+            return False
+        if 'unless' in step and any(self.flags(step['unless'])):
+            return False
+        return True
+
+    async def run_steps(self, page, scope, steps, stage):
+        for step in steps:
+            if self.applies(step):
+                await self.run_step(page, scope, step, stage)
+
+    async def run_step(self, page, scope, step, stage):
+        """Run one step with its retries, timing it under 'stage/step'"""
+        await self.search_running.wait_if_paused()
+        name = f"{stage}/{step.get('name') or step.get('field') or step['action']}"
+        attempts = step.get('retries', 0) + 1
+        started = time.monotonic()
+        try:
+            for attempt in range(attempts):
+                try:
+                    await self.perform(page, scope, step, stage)
+                    return
+                except Exception as e:
+                    if attempt + 1 < attempts:
+                        self.log(f"Step {name} failed, retrying: {str(e)}", stage=stage)
+                    elif step.get('optional'):
+                        self.log(f"Skipping step {name}: {str(e)}", stage=stage)
+                    else:
+                        raise
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.monotonic() - started
+
+    def value(self, step):
+        if 'field' in step:
+            key = (step['field'], step.get('format'))
+            if key not in self.values:
+                value = self.personal_info[step['field']]
+                self.values[key] = step['format'](value) if 'format' in step else value
+            return self.values[key]
+        value = step.get('value')
+        return value() if callable(value) else value
+
+    def prepare_booking(self):
+        """
+        Validate and format the booking data before searching.
+
+        A missing or invalid value would otherwise only fail once a slot is
+        held; autobook is turned off instead and slots are still alerted.
+        """
+        if not self.autobook or 'book' not in self.flow['search']:
+            return
+        for step in field_steps(self.flow['search']['book']):
+            try:
+                self.value(step)
+            except KeyError:
+                reason = f"{step['field']} is missing"
+            except ValueError as e:
+                reason = f"{step['field']}: {str(e)}"
+            else:
+                continue
+            self.autobook = False
+            self.log(f"Autobook disabled, {reason}")
+            return
+
+    def timeout(self, step, stage):
+        """Timeout keyword for Playwright calls, when the step names a budget or its stage has one"""
+        budget = step.get('budget', stage if stage in self.policy.budgets else None)
+        return {'timeout': self.policy.budget(budget)} if budget else {}
+
+    async def perform(self, page, scope, step, stage):
+        action = step['action']
+        if 'log' in step:
+            self.log(step['log'])
+        locator = scope.locator(step['selector']).first if 'selector' in step else None
+
+        if action == 'goto':
+            await self.policy.goto(page, step['url'])
+        elif action == 'click':
+            await locator.click(**self.timeout(step, stage))
+        elif action == 'fill':
+            await locator.fill(self.value(step), **self.timeout(step, stage))
+        elif action == 'select':
+            await locator.select_option(self.value(step), **self.timeout(step, stage))
+        elif action == 'check':
+            await locator.check(force=step.get('force', False), **self.timeout(step, stage))
+        elif action == 'wait':
+            await self.policy.wait_for(locator, step.get('budget', stage), step.get('state', 'visible'))
+        elif action == 'load':
+            await self.policy.wait_for_load(page, step.get('budget', 'navigation'), step.get('state', 'domcontentloaded'))
+        elif action == 'evaluate':
+            if locator is not None:
+                await locator.evaluate(step['script'], self.value(step))
+            else:
+                await page.evaluate(step['script'])
+        elif action == 'fill_form':
+            await self.fill_form(scope, step, stage)
+        elif action == 'first_of':
+            await self.first_of(page, scope, step, stage)
+        elif action == 'branch':
+            await self.branch(page, scope, step, stage)
+        else:
+            raise ValueError(f"Unknown flow action: {action}")
+
+        if step.get('pause', action in PAUSED_ACTIONS):
+            await self.policy.pause(page, 'action')
+
+    async def fill_form(self, scope, step, stage):
+        """
+        Fill all the 'fields' of the step in one evaluate (see forms.py).
+
+        A field that did not take, missing, disabled or reading back another
+        value, is filled again on its own with Playwright, which waits for it.
+        """
+        fields = [(field, self.value(field)) for field in step['fields']]
+        failed = await fill_form(scope.locator('body'), [(field['selector'], value, field.get('verify', True))
+                                                         for field, value in fields])
+        for field, value in fields:
+            if field['selector'] not in failed:
+                continue
+            outcome = failed[field['selector']]
+            self.log(f"Field {field['selector']} {outcome['reason']}, filling it directly")
+            locator = scope.locator(field['selector']).first
+            if outcome['kind'] == 'check' or isinstance(value, bool):
+                await locator.set_checked(bool(value), force=True, **self.timeout(step, stage))
+            elif outcome['kind'] == 'select':
+                await locator.select_option(value, **self.timeout(step, stage))
+            else:
+                await locator.fill(value, **self.timeout(step, stage))
+
+    async def first_of(self, page, scope, step, stage):
+        """Try each alternative of the step in turn until one works, the remembered one first"""
+        alternatives = [(index, alternative) for index, alternative in enumerate(step['steps'])
+                        if isinstance(alternative, list) or self.applies(alternative)]
+        key = f"{self.key}/{step.get('name')}"
+        remembered = self.strategies.get(key) if step.get('remember') else None
+        alternatives.sort(key=lambda item: item[0] != remembered)
+        for attempt, (index, alternative) in enumerate(alternatives):
+            try:
+                if isinstance(alternative, list):
+                    for part in alternative:
+                        if self.applies(part):
+                            await self.perform(page, scope, part, stage)
+                else:
+                    await self.perform(page, scope, alternative, stage)
+            except Exception:
+                if attempt + 1 == len(alternatives):
+                    raise
+                continue
+            if step.get('remember') and index != remembered:
+                self.strategies[key] = index
+                save_strategies(self.strategies_path, self.strategies)
+            return
+
+    async def branch(self, page, scope, step, stage):
+        """Wait for whichever option shows up first, then set its flags and run its steps"""
+        locators = [scope.locator(option['selector']) for option in step['options']]
+        shown = locators[0]
+        for locator in locators[1:]:
+            shown = shown.or_(locator)
+        try:
+            await self.policy.wait_for(shown.first, step.get('budget', stage))
+        except Exception:
+            pass
+
+        for option, locator in zip(step['options'], locators):
+            if await locator.first.is_visible():
+                self.state.update(option.get('set', {}))
+                if 'log' in option:
+                    self.log(option['log'])
+                await self.run_steps(page, scope, option.get('steps', []), stage)
+                return
+        raise PageChanged(step.get('error', 'None of the expected pages showed up'))
+
+    async def detect(self, page, scope, marks):
+        """
+        Result of the last search.
+
+        Taken from the first push source (page observer, network watcher) to
+        report it; the page is only classified directly when none of them
+        reported in time.
+        """
+        spec = self.flow['search']
+        result = None
+        if self.sources:
+            with self.policy.step('response'), self.policy.waiting():
+                result = await wait_for_first_result(page, self.sources, marks, self.detection['response_timeout'])
+        if result is None:
+            with self.policy.step('results'), self.policy.waiting():
+                if 'settle' in spec:
+                    await page.wait_for_load_state(spec['settle'], timeout=self.policy.budget('results'))
+                result = await classify_page(scope.locator('body'), self.flow['rules'], self.policy.budget('results'))
+        if result.state is SlotState.SESSION_EXPIRED:
+            raise SessionExpired(f'{self.name} session expired, back on the identity form')
+        return result
+
+    async def search(self, page):
+        """Stage 'results': search again and again until a slot is found or the search stops"""
+        spec = self.flow['search']
+        scope = self.scope(page, spec.get('frame'))
+        steps = spec.get('enter', spec['submit'])
+        last_digest = None
+        marks = [source.seq for source in self.sources]
+        self.pushed.clear()
+        while self.search_running.get():
+            await self.scheduler.wait(self.pushed)
+            await self.search_running.wait_if_paused()
+            result = self.pushed_slot(marks)
+            if result is not None:
+                self.log("Slot pushed between two searches, handling it without searching")
+            else:
+                marks = [source.seq for source in self.sources]
+                self.scheduler.searching()
+                with self.policy.step('search'):
+                    await self.run_steps(page, scope, steps, 'search')
+                steps = spec['submit']
+                result = await self.detect(page, scope, marks)
+            # What the sources push from now on is about a later change of the page
+            marks = [source.seq for source in self.sources]
+            self.pushed.clear()
+
+            self.checkpoint.succeeded()
+            self.supervisor.succeeded()
+            self.scheduler.record(result.state)
+            unchanged = result.digest is not None and result.digest == last_digest
+            last_digest = result.digest
+
+            if result.state is SlotState.SLOT_FOUND and unchanged:
+                self.log("Same results as the last search, slot already notified")
+            elif result.state is SlotState.SLOT_FOUND:
+                records, wanted = await self.new_slots(scope, result)
+                if not wanted:
+                    self.log(f"{len(records)} slot(s) found, none new matching the preferences")
+                    if spec['after_slot'] == 'restart':
+                        # The held slot blocks the search form, release it
+                        raise SlotNotWanted(f'{self.name} slot not wanted, released')
+                else:
+                    for record in wanted:
+                        self.log(f"Slot: {record.describe()}")
+                    booking = self.autobook and 'book' in spec
+                    if not booking:
+                        self.seen.mark(wanted)
+                    await slot_found(page, self.key, self.name, booking)
+                    if booking:
+                        await self.book(page, scope, result.received_at, wanted)
+                        return
+                    await self.policy.pause(page, 'slot_hold')
+                    if spec['after_slot'] == 'restart':
+                        self.log("Failed to book slot, timer expired")
+                        raise SlotExpired(f'Failed to book slot {self.name}, timer expired')
+            elif result.state is SlotState.NO_SLOTS:
+                self.log("No slots available" + (" (unchanged)" if unchanged else ""))
+            elif result.state is SlotState.SERVER_ERROR:
+                self.log("Server error while searching for slots")
+            elif spec.get('on_unknown') == 'raise':
+                self.log(f"Failed to parse {self.name} response")
+                raise PageChanged(f'Failed to parse {self.name} response')
+
+            reset = spec.get('reset', {}).get(result.state.name.lower())
+            if reset:
+                with self.policy.step('new_search'):
+                    await self.run_steps(page, scope, reset, 'new_search')
+            await self.policy.end_cycle()
+
+    def on_push(self, source, result):
+        """Source listener: a slot pushed by the page observer wakes the search up at once"""
+        if result.source == 'observer' and result.state is SlotState.SLOT_FOUND:
+            self.pushed.set()
+
+    def pushed_slot(self, marks):
+        """SLOT_FOUND pushed by the page observer since `marks`, outside of any search of ours"""
+        for source, mark in zip(self.sources, marks):
+            if (source.seq > mark and source.latest.source == 'observer' and
+                    source.latest.state is SlotState.SLOT_FOUND):
+                return source.latest
+        return None
+
+    async def new_slots(self, scope, result):
+        """
+        Slot records of a SLOT_FOUND result, and those worth alerting: matching
+        the preferences and not already in the seen-slot index.
+
+        Network results carry their records; otherwise they are read from the
+        page in one pass. A page the records cannot be read from still counts
+        as one slot, identified by its results digest.
+        """
+        if result.slots:
+            records = [record_from_payload(self.key, entry) for entry in result.slots]
+        else:
+            records = []
+            if 'slots' in self.flow['search']:
+                try:
+                    records = await extract_slots(self.key, scope.locator('body'), self.flow['search']['slots'])
+                except Exception as e:
+                    self.log(f"Could not read the slots: {str(e)}")
+        if not records:
+            records = [SlotRecord(self.key, text=result.digest or str(result.received_at))]
+        wanted = [record for record in records if matches_preferences(record, self.preferences)]
+        return records, self.seen.fresh(wanted)
+
+    async def book(self, page, scope, detected_at, records):
+        """
+        Run the flow's 'book' steps on the slot just found, then stop the search.
+
+        The slot `records` go to the seen-slot index once booked, or after
+        BOOKING_ATTEMPTS failed bookings; until then a failed booking is
+        retried when the slot shows up again.
+
+        Logs the time from the detection of the slot to the confirmation, the
+        window in which someone else can take the slot, and its slowest steps.
+        The search is stopped once the proof of booking is captured: stopping
+        cancels every provider task, this one included.
+        """
+        self.log(f"Booking slot, {(time.time() - detected_at) * 1000:.0f} ms after detection...")
+        try:
+            with self.policy.step('book'):
+                await self.run_steps(page, scope, self.flow['search']['book'], 'book')
+        except Exception:
+            keys = [record.key() for record in records]
+            failures = max(self.booking_failures.get(key, 0) for key in keys) + 1
+            self.booking_failures.update((key, failures) for key in keys)
+            if failures >= BOOKING_ATTEMPTS:
+                self.log(f"Booking failed {failures} times, not trying this slot again")
+                self.seen.mark(records)
+            raise
+        self.seen.mark(records)
+        latency = time.time() - detected_at
+        log_message("Booking Confirmed", provider=self.name)
+        steps = sorted(((name, seconds) for name, seconds in self.timings.items() if name.startswith('book/')),
+                       key=lambda item: item[1], reverse=True)[:SLOWEST_STEPS]
+        self.log(f"Booked {latency:.2f}s after detection, slowest steps: " +
+                 ", ".join(f"{name} {seconds:.2f}s" for name, seconds in steps), stage='book', duration=round(latency, 3))
+        await take_screenshot(page, self.key, "screenshots", "slot_confirmed")
+        self.search_running.set(False)
+        for listener in booking_listeners:
+            listener(self.key)
+
+    def end_cycle(self, label):
+        """Cycle listener listing the slowest steps of the cycle"""
+        if self.policy.log_timing and self.timings:
+            slowest = sorted(self.timings.items(), key=lambda item: item[1], reverse=True)[:SLOWEST_STEPS]
+            self.log(f"{label} slowest steps: " + ", ".join(f"{name} {seconds:.1f}s" for name, seconds in slowest))
+        self.timings = {}
+
+async def cancel_when_stopped(token, tasks):
+    """Cancel the provider tasks as soon as `token` is cancelled, from any thread"""
+    loop = asyncio.get_running_loop()
+    stopped = asyncio.Event()
+    remove = token.on_cancel(lambda: loop.call_soon_threadsafe(stopped.set))
+    try:
+        await stopped.wait()
+        for task in tasks:
+            task.cancel()
+    finally:
+        remove()
+
+async def run_flows(flows, config, search_running, autobook=False, testing_mode=False, testing_delay=0, headless=False):
+    """
+    Run every flow in `flows` as a coroutine on one event loop and one browser.
+
+    Each provider gets its own context on the shared browser. `search_running`
+    is a cancellation.CancelToken: cancelling it cancels every task wherever it
+    is waiting, and so does a provider stopping the search (booking); the
+    contexts and the browser are closed on the way out. As the providers all
+    run on this loop, they share one notification dispatcher and one
+    screenshot writer per process.
+    """
+    async with BrowserManager(headless, load_settings(config)['profile']) as manager:
+        runners = [FlowRunner(flow, config, search_running, autobook, manager, testing_mode, testing_delay)
+                   for flow in flows]
+        tasks = [asyncio.create_task(runner.run(), name=runner.name) for runner in runners]
+        watcher = asyncio.create_task(cancel_when_stopped(search_running, tasks))
+        try:
+            for runner, outcome in zip(runners, await asyncio.gather(*tasks, return_exceptions=True)):
+                if isinstance(outcome, Exception):
+                    log_message(f"[{runner.name}] Stopped after an error: {str(outcome)}")
+        finally:
+            watcher.cancel()
@@ -0,0 +1,81 @@
+import pygame
+from collections import OrderedDict
+from functools import lru_cache
+
+# System fonts tried in order for each script, the first one installed is used
+SCRIPT_FONTS = {
+    'devanagari': ['nirmala ui', 'mangal', 'aparajita'],
+    'cjk': ['simsun'],
+    'latin': ['segoe ui'],
+    'fallback': [],
+}
+FALLBACK_FONT = 'arial unicode ms'  # used when none of a script's fonts is installed
+TEXT_CACHE_SIZE = 256  # rendered surfaces kept, a frame draws about 30
+
+@lru_cache(maxsize=1024)
+def script_of(text):
+    """Script a text needs a font for, checked once per distinct text"""
+    if any('\u0900' <= char <= '\u097f' for char in text):  # Hindi characters
+        return 'devanagari'
+    if any('\u4e00' <= char <= '\u9fff' for char in text):  # Chinese characters
+        return 'cjk'
+    return 'latin'
+
+class FontRegistry:
+    """
+    One pygame font per script and size, loaded on first use.
+
+    SysFont searches the system font list on every call, so fonts are
+    looked up once here and kept for the life of the window.
+    """
+
+    def __init__(self):
+        self.fonts = {}  # (script, size) -> pygame.font.Font
+
+    def get(self, script, size):
+        key = (script, size)
+        if key not in self.fonts:
+            self.fonts[key] = self.load(script, size)
+        return self.fonts[key]
+
+    def load(self, script, size):
+        for name in SCRIPT_FONTS[script]:
+            # SysFont falls back to pygame's default font silently, match_font tells if it exists
+            if pygame.font.match_font(name):
+                return pygame.font.SysFont(name, size)
+        return pygame.font.SysFont(FALLBACK_FONT, size)
+
+    def for_text(self, text, size):
+        return self.get(script_of(text), size)
+
+class TextCache:
+    """
+    Rendered text surfaces by (text, color, size), least recently used dropped first.
+
+    Most of a frame is the same labels and values as the previous one, so a
+    steady frame blits cached surfaces instead of rendering them again.
+    """
+
+    def __init__(self, fonts, size=TEXT_CACHE_SIZE):
+        self.fonts = fonts
+        self.size = size
+        self.surfaces = OrderedDict()
+
+    def render(self, text, color, font_size=16):
+        key = (text, color, font_size)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+        try:
+            surface = self.fonts.for_text(text, font_size).render(text, True, color)
+        except pygame.error:
+            # A font that cannot render the text, fall back to the widest coverage font
+            surface = self.fonts.get('fallback', font_size).render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
@@ -0,0 +1,78 @@
+# Fill a whole form in one evaluate: every value is set the way a user typing
+# or picking it would leave it, then read back once all handlers have run.
+# Inputs get the native value setter (Angular and React wrap the property) and
+# input/change/blur events; selects take an option by value or label;
+# checkboxes and radios are clicked, which also runs ASP.NET onclick handlers.
+# Returns {selector: {'kind', 'reason'}} for the fields that did not take.
+FILL_JS = """
+(root, fields) => {
+    const doc = root.ownerDocument || document;
+    const win = doc.defaultView;
+    const fire = (element, type) => element.dispatchEvent(new win.Event(type, {bubbles: true}));
+    const kindOf = (element) => {
+        if (element.tagName === 'SELECT') {
+            return 'select';
+        }
+        return element.type === 'checkbox' || element.type === 'radio' ? 'check' : 'fill';
+    };
+    const failed = {};
+    const filled = [];
+    for (const field of fields) {
+        const element = doc.querySelector(field.selector);
+        if (!element) {
+            failed[field.selector] = {kind: null, reason: 'not found'};
+            continue;
+        }
+        const kind = kindOf(element);
+        if (element.disabled || element.readOnly) {
+            failed[field.selector] = {kind, reason: 'disabled'};
+            continue;
+        }
+        let expected = field.value;
+        element.focus();
+        if (kind === 'check') {
+            expected = Boolean(field.value);
+            if (element.checked !== expected) {
+                element.click();
+            }
+        } else if (kind === 'select') {
+            const option = Array.from(element.options).find((option) =>
+                option.value === field.value || option.label === field.value || option.text.trim() === field.value);
+            if (!option) {
+                failed[field.selector] = {kind, reason: 'no such option'};
+                continue;
+            }
+            expected = option.value;
+            element.value = option.value;
+            fire(element, 'input');
+            fire(element, 'change');
+        } else {
+            const prototype = element.tagName === 'TEXTAREA' ? win.HTMLTextAreaElement.prototype : win.HTMLInputElement.prototype;
+            Object.getOwnPropertyDescriptor(prototype, 'value').set.call(element, field.value);
+            fire(element, 'input');
+            fire(element, 'change');
+        }
+        element.blur();
+        filled.push({field, element, kind, expected});
+    }
+    // Verified after every field is set, handlers of one field may reset another
+    for (const {field, element, kind, expected} of filled) {
+        const actual = kind === 'check' ? element.checked : element.value;
+        if (field.verify && actual !== expected) {
+            failed[field.selector] = {kind, reason: `reads ${JSON.stringify(actual)}`};
+        }
+    }
+    return failed;
+}
+"""
+
+async def fill_form(root, fields):
+    """
+    Set every field of a form in a single round trip and verify them.
+
+    `root` is any locator in the form's document (page.locator('body') or a
+    frame locator's), `fields` a list of (selector, value, verify). Returns
+    the fields that did not take, by selector.
+    """
+    payload = [{'selector': selector, 'value': value, 'verify': verify} for selector, value, verify in fields]
+    return await root.evaluate(FILL_JS, payload)
@@ -1,18 +1,50 @@
 import pygame
 import threading
 from languages import translations, languages
-import browser
 import sys
 import json
 import os
+import logger
 from logger import default_message_queue, log_message
+from settings import load_settings
+from worker import SearchWorker
+from fonts import FontRegistry, TextCache
+from log_panel import LogPanel, SCROLL_LINES
+
+# Timer events waking the event loop up, nothing else redraws an idle window
+CURSOR_BLINK_EVENT = pygame.USEREVENT + 1
+WORKER_POLL_EVENT = pygame.USEREVENT + 2
+WORKER_POLL_INTERVAL = 200  # milliseconds between two reads of the worker events
+MAX_DIRTY_RECTS = 8  # beyond this many separate regions a frame redraws the whole window once
+
+def coalesce(rects, window):
+    """
+    Fewest regions covering `rects` within `window`, each drawn once.
+
+    Overlapping regions, and those inside another, are merged into their
+    union; past MAX_DIRTY_RECTS regions the whole window is drawn instead.
+    """
+    merged = []
+    for rect in rects:
+        rect = rect.clip(window)
+        if not rect.width or not rect.height:
+            continue
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect = rect.union(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+        if len(merged) > MAX_DIRTY_RECTS:
+            return [window]
+    return merged
 
 class AppGUI:
     def __init__(self):
         pygame.init()
-        self.width = 600
-        self.height = 800
-        self.screen = pygame.display.set_mode((self.width, self.height))
+        self.width = 600  # form column, the log panel is on its right
+        self.height = 720  # fits 768 px laptop screens with the taskbar
+        self.log_panel_width = 440
+        self.screen = pygame.display.set_mode((self.width + self.log_panel_width, self.height))
         pygame.display.set_caption("RVSQ Appointment Finder")
         
         # Colors
@@ -25,52 +57,26 @@ class AppGUI:
         self.GREEN = (34, 197, 94)
         self.HOVER_GREEN = (22, 163, 74)
         self.HOVER_RED = (220, 38, 38)
+        self.HOVER_BLUE = (37, 99, 235)
         self.INPUT_BG = (248, 250, 252)  # Slightly off-white for input fields
         self.INPUT_BG_ACTIVE = (255, 255, 255)
         self.INPUT_BORDER = (203, 213, 225)  # Tailwind slate-300
         self.INPUT_BORDER_ACTIVE = self.BLUE
         self.INPUT_SHADOW = (241, 245, 249)  # Tailwind slate-100
         
-        # Fonts with better international support
-        try:
-            # For Latin characters
-            self.latin_font = pygame.font.SysFont('segoe ui', 16)
-            # For Chinese characters
-            self.chinese_font = pygame.font.SysFont('simsun', 16)
-            # For Hindi characters - try multiple Hindi fonts
-            hindi_fonts = ['nirmala ui', 'mangal', 'aparajita']
-            self.hindi_font = None
-            for font_name in hindi_fonts:
-                try:
-                    self.hindi_font = pygame.font.SysFont(font_name, 16)
-                    test_text = self.hindi_font.render('हिंदी', True, (0, 0, 0))
-                    break
-                except:
-                    continue
-            if not self.hindi_font:
-                self.hindi_font = pygame.font.SysFont('arial unicode ms', 16)
-            
-            self.title_font = self.latin_font
-            self.main_font = self.latin_font
-            self.log_font = self.latin_font
-        except:
-            default_font = pygame.font.SysFont('arial unicode ms', 16)
-            self.latin_font = default_font
-            self.chinese_font = default_font
-            self.hindi_font = default_font
-            self.title_font = default_font
-            self.main_font = default_font
-            self.log_font = default_font
-        
+        # Fonts loaded once per script and size, rendered text cached by (text, color, size)
+        self.fonts = FontRegistry()
+        self.text_cache = TextCache(self.fonts)
+        # Semi-transparent overlay behind the language dropdown, built once
+        self.overlay = pygame.Surface(self.screen.get_size())
+        self.overlay.fill(self.WHITE)
+        self.overlay.set_alpha(128)
 
         # Autobook appointement
         self.autobook = True
         
         # Testing mode for slow step-by-step execution
         self.testing_mode = True  # Default to testing mode for easier debugging
-        
-        # Initialize browser testing mode
-        browser.set_testing_mode(self.testing_mode)
 
         # Initialize translations first
         self.translations = translations
@@ -95,9 +101,12 @@ class AppGUI:
         
         self.field_width = 500
         self.field_height = 40
-        start_y = 180
-        spacing = 65
+        start_y = 160
+        spacing = 60
         self.center_x = (self.width - self.field_width) // 2
+        # Short fields go two to a row to keep the window within the height
+        half_width = self.field_width // 2 - 10
+        right_x = self.center_x + self.field_width - half_width
         
         # Load logo
         try:
@@ -125,61 +134,61 @@ class AppGUI:
         self.fields = {
             'first_name': {
                 'text': '',
-                'rect': pygame.Rect(self.center_x, start_y, self.field_width, self.field_height),
+                'rect': pygame.Rect(self.center_x, start_y, half_width, self.field_height),
                 'label': self.get_text('first_name'),
                 'placeholder': self.get_text('placeholder_first_name')
             },
             'last_name': {
                 'text': '',
-                'rect': pygame.Rect(self.center_x, start_y + spacing, self.field_width, self.field_height),
+                'rect': pygame.Rect(right_x, start_y, half_width, self.field_height),
                 'label': self.get_text('last_name'),
                 'placeholder': self.get_text('placeholder_last_name')
             },
             'nam': {
                 'text': '',
-                'rect': pygame.Rect(self.center_x, start_y + spacing*2, self.field_width, self.field_height),
+                'rect': pygame.Rect(self.center_x, start_y + spacing, self.field_width, self.field_height),
                 'label': self.get_text('nam'),
                 'placeholder': self.get_text('placeholder_nam')
             },
             'card_seq_number': {
                 'text': '',
-                'rect': pygame.Rect(self.center_x, start_y + spacing*3, self.field_width, self.field_height),
+                'rect': pygame.Rect(self.center_x, start_y + spacing*2, self.field_width, self.field_height),
                 'label': self.get_text('card_seq_number'),
                 'placeholder': self.get_text('placeholder_card_seq')
             },
             'postal_code': {
                 'text': '',
-                'rect': pygame.Rect(self.center_x, start_y + spacing*4, self.field_width, self.field_height),
+                'rect': pygame.Rect(self.center_x, start_y + spacing*3, half_width, self.field_height),
                 'label': self.get_text('postal_code'),
                 'placeholder': self.get_text('placeholder_postal_code')
             },
             'cellphone': {
                 'text': '',
-                'rect': pygame.Rect(self.center_x, start_y + spacing*5, self.field_width, self.field_height),
+                'rect': pygame.Rect(right_x, start_y + spacing*3, half_width, self.field_height),
                 'label': self.get_text('cellphone'),
                 'placeholder': self.get_text('placeholder_cellphone')
             },
             'email': {
                 'text': '',
-                'rect': pygame.Rect(self.center_x, start_y + spacing*6, self.field_width, self.field_height),
+                'rect': pygame.Rect(self.center_x, start_y + spacing*4, self.field_width, self.field_height),
                 'label': self.get_text('email'),
                 'placeholder': self.get_text('placeholder_email')
             },
             'birth_day': {
                 'text': '',
-                'rect': pygame.Rect(self.center_x, start_y + spacing*7, self.field_width//3 - 10, self.field_height),
+                'rect': pygame.Rect(self.center_x, start_y + spacing*5, self.field_width//3 - 10, self.field_height),
                 'label': self.get_text('birth_day'),
                 'placeholder': self.get_text('placeholder_birth_day')
             },
             'birth_month': {
                 'text': '',
-                'rect': pygame.Rect(self.center_x + self.field_width//3, start_y + spacing*7, self.field_width//3 - 10, self.field_height),
+                'rect': pygame.Rect(self.center_x + self.field_width//3, start_y + spacing*5, self.field_width//3 - 10, self.field_height),
                 'label': self.get_text('birth_month'),
                 'placeholder': self.get_text('placeholder_birth_month')
             },
             'birth_year': {
                 'text': '',
-                'rect': pygame.Rect(self.center_x + 2*(self.field_width//3), start_y + spacing*7, self.field_width//3, self.field_height),
+                'rect': pygame.Rect(self.center_x + 2*(self.field_width//3), start_y + spacing*5, self.field_width//3, self.field_height),
                 'label': self.get_text('birth_year'),
                 'placeholder': self.get_text('placeholder_birth_year')
             }
@@ -194,14 +203,16 @@ class AppGUI:
         button_width = 100
         button_height = 35
         button_spacing = 10
-        buttons_y = start_y + spacing*8 + 10  # Adjusted for new fields
+        buttons_y = start_y + spacing*6 + 10  # Below the six rows of fields
         
         # Center buttons
-        total_buttons_width = (button_width * 2) + button_spacing
+        total_buttons_width = (button_width * 3) + button_spacing * 2
         buttons_start_x = (self.width - total_buttons_width) // 2
         
         self.start_button = pygame.Rect(buttons_start_x, buttons_y, button_width, button_height)
-        self.stop_button = pygame.Rect(buttons_start_x + button_width + button_spacing, 
+        self.pause_button = pygame.Rect(buttons_start_x + button_width + button_spacing,
+                                      buttons_y, button_width, button_height)
+        self.stop_button = pygame.Rect(buttons_start_x + 2 * (button_width + button_spacing),
                                      buttons_y, button_width, button_height)
         
         # Checkboxes below buttons - positioned horizontally
@@ -218,18 +229,33 @@ class AppGUI:
         
         # Cursor blink timer
         self.cursor_visible = True
-        self.cursor_timer = 0
         self.CURSOR_BLINK_TIME = 530  # milliseconds
+        pygame.time.set_timer(CURSOR_BLINK_EVENT, self.CURSOR_BLINK_TIME)
+        pygame.time.set_timer(WORKER_POLL_EVENT, WORKER_POLL_INTERVAL)
         
         # Status and logging with better positioning
         self.status = "Ready to start"
-        self.log_messages = []
+        # Everything from the status line down, redrawn when the search reports something
+        status_y = self.testing_mode_checkbox.bottom + 70
+        self.status_rect = pygame.Rect(0, status_y, self.width, self.height - status_y)
+        # Regions of the window to redraw at the next render, the whole window first
+        self.dirty = [self.screen.get_rect()]
+        # Every log line of the GUI and the worker, in the panel right of the form
+        self.log_panel = LogPanel(pygame.Rect(self.width, 0, self.log_panel_width, self.height), self.fonts)
+        for record in list(default_message_queue):
+            self.log_panel.add(record)
+        logger.listeners.append(self.add_log)
         
         self.active_field = None
         self.running = True
         self.search_running = SharedBoolean(False)
+        self.paused = False  # the running search is paused, the pause button resumes it
+        self.worker = SearchWorker()
+        self.paused_providers = {}  # provider -> why its circuit is open
+        self.settings = {}
         # Load saved config
         self.load_saved_config()
+        logger.start_file_sink(load_settings(self.build_config())['logging'], 'gui')
         
 
     def load_saved_config(self):
@@ -239,34 +265,30 @@ class AppGUI:
                 personal_info = config['personal_info']
                 for field in self.fields:
                     self.fields[field]['text'] = personal_info.get(field, '')
+                # Advanced automation settings are only edited by hand in config.json
+                self.settings = config.get('settings', {})
         except FileNotFoundError:
             pass
 
-    def save_config(self):
-        config = {
+    def build_config(self):
+        return {
             "personal_info": {
                 field: self.fields[field]['text']
                 for field in self.fields
-            }
+            },
+            "settings": self.settings
         }
+
+    def save_config(self):
+        config = self.build_config()
+        if not config['settings']:
+            del config['settings']
         with open('config.json', 'w') as f:
             json.dump(config, f, indent=4)
 
     def render_text(self, text, color, font_size=16):
-        """Render text with appropriate font based on content"""
-        try:
-            if any('\u0900' <= char <= '\u097f' for char in text):  # Hindi characters
-                font = pygame.font.SysFont('nirmala ui', font_size)
-            elif any('\u4e00' <= char <= '\u9fff' for char in text):  # Chinese characters
-                font = pygame.font.SysFont('simsun', font_size)
-            else:
-                font = pygame.font.SysFont('segoe ui', font_size)
-            
-            return font.render(text, True, color)
-        except:
-            # Fallback to arial unicode ms if specific font fails
-            fallback_font = pygame.font.SysFont('arial unicode ms', font_size)
-            return fallback_font.render(text, True, color)
+        """Render text with appropriate font based on content, from the text cache when possible"""
+        return self.text_cache.render(text, color, font_size)
     
     def draw_checkbox(self, rect, checked, label):
         """Draw a checkbox with label"""
@@ -341,7 +363,7 @@ class AppGUI:
             
             # Draw cursor with better positioning
             if self.active_field == field_name and self.cursor_visible:
-                text_width = self.render_text(field['text'], self.BLACK).get_width()
+                text_width = text_surface.get_width() if field['text'] else 0
                 cursor_x = field['rect'].x + 12 + text_width
                 cursor_y = field['rect'].y + 8
                 pygame.draw.line(self.screen, self.BLACK,
@@ -351,7 +373,8 @@ class AppGUI:
         
         # Draw buttons with updated styling
         button_y = self.fields['birth_year']['rect'].bottom + 20
-        for button, text in [(self.start_button, self.get_text('start')), 
+        for button, text in [(self.start_button, self.get_text('start')),
+                           (self.pause_button, self.get_text('resume' if self.paused else 'pause')),
                            (self.stop_button, self.get_text('stop'))]:
             is_start = button == self.start_button
             is_enabled = (is_start and not self.search_running.get()) or (not is_start and self.search_running.get())
@@ -360,6 +383,8 @@ class AppGUI:
             if is_enabled:
                 if is_start:
                     color = self.HOVER_GREEN if is_hovered else self.GREEN
+                elif button == self.pause_button:
+                    color = self.HOVER_BLUE if is_hovered else self.BLUE
                 else:
                     color = self.HOVER_RED if is_hovered else self.RED
             else:
@@ -386,7 +411,21 @@ class AppGUI:
         notification_rect2 = notification_text2.get_rect(centerx=self.width//2, y=notification_y + 20)
         self.screen.blit(notification_text1, notification_rect1)
         self.screen.blit(notification_text2, notification_rect2)
-        
+
+        # Search status, then the providers paused by their circuit breaker
+        status_y = notification_y + 50
+        status_text = self.render_text(self.status, self.BLACK)
+        self.screen.blit(status_text, status_text.get_rect(centerx=self.width//2, y=status_y))
+        for provider, detail in sorted(self.paused_providers.items()):
+            status_y += 20
+            paused_text = self.render_text(f"{provider} paused: {detail}", self.RED)
+            self.screen.blit(paused_text, paused_text.get_rect(centerx=self.width//2, y=status_y))
+        
+        self.log_panel.draw(self.screen, self.render_text, {
+            'background': self.INPUT_BG, 'border': self.INPUT_BORDER, 'text': self.BLACK,
+            'chip': self.LIGHT_BLUE, 'chip_text': self.BLUE,
+        })
+
         # Draw language selector and dropdown LAST to appear on top
         # Language button
         pygame.draw.rect(self.screen, self.BLUE, self.language_button, border_radius=6)
@@ -399,10 +438,7 @@ class AppGUI:
         # Draw dropdown if open (on top of everything)
         if self.language_dropdown_open:
             # Add semi-transparent overlay behind dropdown
-            overlay = pygame.Surface((self.width, self.height))
-            overlay.fill(self.WHITE)
-            overlay.set_alpha(128)
-            self.screen.blit(overlay, (0, 0))
+            self.screen.blit(self.overlay, (0, 0))
             
             # Draw dropdown background with shadow
             shadow_rect = self.dropdown_rect.inflate(4, 4)
@@ -429,8 +465,31 @@ class AppGUI:
                 lang_text = self.render_text(lang, self.BLACK)
                 text_y = option_rect.y + (option_rect.height - lang_text.get_height()) // 2
                 self.screen.blit(lang_text, (option_rect.x + 8, text_y))
-        
-        pygame.display.flip()
+
+    def invalidate(self, rect=None):
+        """Mark `rect` (default the whole window) to be redrawn at the next render"""
+        self.dirty.append(rect if rect is not None else self.screen.get_rect())
+
+    def field_area(self, field_name):
+        """Region of a field including its focus glow"""
+        return self.fields[field_name]['rect'].inflate(6, 6)
+
+    def render(self):
+        """
+        Redraw the dirty regions only and push just them to the display.
+
+        The scene is drawn clipped to each region, so overlapping widgets stay
+        correct while an idle window or a blinking cursor costs next to nothing.
+        """
+        if not self.dirty:
+            return
+        rects = coalesce(self.dirty, self.screen.get_rect())
+        self.dirty = []
+        for rect in rects:
+            self.screen.set_clip(rect)
+            self.draw()
+        self.screen.set_clip(None)
+        pygame.display.update(rects)
 
     def next_field(self):
         """Navigate to the next field in tab order"""
@@ -451,7 +510,27 @@ class AppGUI:
             self.active_field = self.field_order[prev_index]
 
     def handle_event(self, event):
-        if event.type == pygame.MOUSEBUTTONDOWN:
+        if event.type == CURSOR_BLINK_EVENT:
+            self.cursor_visible = not self.cursor_visible
+            if self.active_field:
+                self.invalidate(self.field_area(self.active_field))
+        elif event.type == WORKER_POLL_EVENT:
+            self.update()
+        elif event.type == pygame.MOUSEMOTION:
+            self.invalidate_hover(event)
+        elif event.type in (pygame.VIDEOEXPOSE, getattr(pygame, 'WINDOWEXPOSED', pygame.VIDEOEXPOSE)):
+            self.invalidate()
+        elif event.type == pygame.MOUSEWHEEL:
+            if self.log_panel.rect.collidepoint(pygame.mouse.get_pos()):
+                self.log_panel.scroll_by(event.y * SCROLL_LINES)
+                self.invalidate(self.log_panel.rect)
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button in (4, 5):
+            pass  # wheel notches, handled as MOUSEWHEEL
+        elif event.type == pygame.MOUSEBUTTONDOWN and self.log_panel.handle_click(event.pos):
+            self.invalidate(self.log_panel.rect)
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            # Clicks can change about anything, and are rare
+            self.invalidate()
             # Handle language selector
             if self.language_button.collidepoint(event.pos):
                 self.language_dropdown_open = not self.language_dropdown_open
@@ -484,6 +563,8 @@ class AppGUI:
             # Handle button clicks
             if self.start_button.collidepoint(event.pos) and not self.search_running.get():
                 self.start_search()
+            elif self.pause_button.collidepoint(event.pos) and self.search_running.get():
+                self.toggle_pause()
             elif self.stop_button.collidepoint(event.pos) and self.search_running.get():
                 self.stop_search()
             
@@ -493,13 +574,15 @@ class AppGUI:
                 log_message(f"[GUI] Autobook toggled to: {self.autobook}")
             elif self.testing_mode_checkbox.collidepoint(event.pos):
                 self.testing_mode = not self.testing_mode
-                # Update browser testing mode
-                browser.set_testing_mode(self.testing_mode)
-                log_message(f"[GUI] Testing mode toggled to: {self.testing_mode}")
+                # Sent to the worker with the next search, a running one keeps its speed
+                log_message(f"[GUI] Testing mode toggled to: {self.testing_mode}" +
+                            (", applies to the next search" if self.search_running.get() else ""))
         
         elif event.type == pygame.KEYDOWN:
             # Handle Tab navigation
             if event.key == pygame.K_TAB:
+                if self.active_field:
+                    self.invalidate(self.field_area(self.active_field))
                 if event.mod & pygame.KMOD_SHIFT:
                     self.previous_field()
                 else:
@@ -509,6 +592,20 @@ class AppGUI:
                     self.fields[self.active_field]['text'] = self.fields[self.active_field]['text'][:-1]
                 else:
                     self.fields[self.active_field]['text'] += event.unicode
+            if self.active_field:
+                # Show the cursor right away while typing
+                self.cursor_visible = True
+                self.invalidate(self.field_area(self.active_field))
+
+    def invalidate_hover(self, event):
+        """Redraw the buttons and dropdown options the mouse entered or left"""
+        previous = (event.pos[0] - event.rel[0], event.pos[1] - event.rel[1])
+        for button in (self.start_button, self.pause_button, self.stop_button):
+            if button.collidepoint(event.pos) != button.collidepoint(previous):
+                self.invalidate(button.inflate(2, 2))
+        if self.language_dropdown_open and (self.dropdown_rect.collidepoint(event.pos) or
+                                            self.dropdown_rect.collidepoint(previous)):
+            self.invalidate(self.dropdown_rect)
 
     def start_search(self):
         if not all(self.fields[field]['text'] for field in self.fields):
@@ -519,44 +616,68 @@ class AppGUI:
         self.search_running.set(True)
         self.status = "Running..."
         
-        # Start the search in a separate thread
-        self.search_thread_1 = threading.Thread(target=self.run_search, args=('bonjoursante', self.search_running, self.autobook))
-        self.search_thread_1.daemon = True
-        self.search_thread_1.start()
-        # UNCOMMENT TO REENABLE RVSQ
-        # self.search_thread_2 = threading.Thread(target=self.run_search, args=('rvsq', self.search_running, False))
-        # self.search_thread_2.daemon = True
-        # self.search_thread_2.start()
+        # The search runs in the worker process, the GUI only exchanges commands and events with it
+        config = self.build_config()
+        # RVSQ can be searched too by adding 'rvsq' to the "providers" setting
+        providers = load_settings(config)['providers']
+        self.paused_providers = {}
+        self.worker.start_search(config, providers, self.autobook, self.testing_mode)
+
     def stop_search(self):
-        self.search_running.set(False)
+        self.worker.stop_search()
         self.status = "Stopping..."
 
-    def run_search(self,website, search_running, autobook):
-        config = {
-            "personal_info": {
-                field: self.fields[field]['text']
-                for field in self.fields
-            }
-        }
-        
-        while search_running.get():
-            try:
-                if(website == 'rvsq'):
-                    browser.run_automation_rvsq(config, search_running)
-                elif ( website == 'bonjoursante'):
-                    browser.run_automation_bonjoursante(config, search_running, autobook)
-            except Exception as e:
-                log_message(f"Error: {str(e)}")
-            finally:
-                # self.search_running = False
+    def toggle_pause(self):
+        """Pause the running search between two steps, or resume it; the worker confirms with a status event"""
+        if self.paused:
+            self.worker.resume_search()
+        else:
+            self.worker.pause_search()
+
+    def handle_worker_events(self):
+        events = self.worker.poll()
+        if events:
+            # Status, paused providers and the buttons following search_running
+            self.invalidate(self.status_rect)
+            self.invalidate(self.start_button.union(self.stop_button).inflate(2, 2))
+        for kind, data in events:
+            if kind == 'log':
+                # Already written to the search log file by the worker
+                logger.publish(data)
+            elif kind == 'provider':
+                provider, state, detail = data
+                if state == 'open':
+                    self.paused_providers[provider] = detail
+                else:
+                    self.paused_providers.pop(provider, None)
+            elif kind == 'slot':
+                self.status = f"Slot found ({data})"
+            elif kind == 'status' and data == 'running':
+                self.search_running.set(True)
+                self.paused = False
+                self.status = "Running..."
+            elif kind == 'status' and data == 'paused':
+                self.paused = True
+                self.status = "Paused"
+            elif kind == 'status' and data == 'stopped':
+                self.search_running.set(False)
+                self.paused = False
                 self.status = "Ready to start"
+            elif kind == 'status' and data == 'crashed':
+                self.search_running.set(False)
+                self.paused = False
+                self.status = "Error: the search stopped unexpectedly"
+                log_message("[GUI] Search worker crashed, it will be restarted with the next search")
+
+    def add_log(self, record):
+        """Logger listener feeding the log panel"""
+        self.log_panel.add(record)
+        # Queued once per frame however many records arrive before it
+        if not any(rect.contains(self.log_panel.rect) for rect in self.dirty):
+            self.invalidate(self.log_panel.rect)
 
     def update(self):
-        # Update cursor blink
-        current_time = pygame.time.get_ticks()
-        if current_time - self.cursor_timer > self.CURSOR_BLINK_TIME:
-            self.cursor_visible = not self.cursor_visible
-            self.cursor_timer = current_time
+        self.handle_worker_events()
 
     def update_language(self):
         """Update all text elements when language changes"""
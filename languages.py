@@ -17,6 +17,8 @@ translations = {
         'placeholder_email': 'test@example.com',
         'start': 'Démarrer',
         'stop': 'Arrêter',
+        'pause': 'Pause',
+        'resume': 'Reprendre',
         'status': 'Statut',
         'ready': 'Prêt à démarrer',
         'running': 'En cours...',
@@ -51,6 +53,8 @@ translations = {
         'placeholder_email': 'test@example.com',
         'start': 'Start',
         'stop': 'Stop',
+        'pause': 'Pause',
+        'resume': 'Resume',
         'status': 'Status',
         'ready': 'Ready to start',
         'running': 'Running...',
@@ -85,6 +89,8 @@ translations = {
         'placeholder_email': 'test@example.com',
         'start': 'Empezar',
         'stop': 'Detener',
+        'pause': 'Pausar',
+        'resume': 'Reanudar',
         'status': 'Estado',
         'ready': 'Listo para empezar',
         'running': 'En ejecución...',
@@ -119,6 +125,8 @@ translations = {
         'placeholder_email': 'test@example.com',
         'start': 'Iniziare',
         'stop': 'Arrestare',
+        'pause': 'Pausa',
+        'resume': 'Riprendere',
         'status': 'Stato',
         'ready': 'Pronto per iniziare',
         'running': 'In esecuzione...',
@@ -153,6 +161,8 @@ translations = {
         'placeholder_email': 'test@example.com',
         'start': 'Kòmèt',
         'stop': 'Arrest',
+        'pause': 'Poz',
+        'resume': 'Kontinye',
         'status': 'Estad',
         'ready': 'Pronto pou kòmèt',
         'running': 'En kouri...',
@@ -187,6 +197,8 @@ translations = {
         'placeholder_email': 'test@example.com',
         'start': '开始',
         'stop': '停止',
+        'pause': '暂停',
+        'resume': '继续',
         'status': '状态',
         'ready': '准备开始',
         'running': '运行中...',
@@ -221,6 +233,8 @@ translations = {
         'placeholder_email': 'test@example.com',
         'start': 'सुरु करें',
         'stop': 'रोकें',
+        'pause': 'विराम',
+        'resume': 'फिर शुरू करें',
         'status': 'सथिति',
         'ready': 'सुरु करने के लिए 準備',
         'running': 'चल रहा है...',
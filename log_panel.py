@@ -0,0 +1,99 @@
+import pygame
+from collections import deque
+from itertools import islice
+from fonts import TextCache
+from logger import LEVELS
+
+LOG_CAPACITY = 5000  # records kept, the oldest are dropped
+LOG_FONT_SIZE = 13
+LINE_HEIGHT = 18
+HEADER_HEIGHT = 34
+SCROLL_LINES = 3  # lines per mouse wheel notch
+
+# A level filter shows its level and the ones after it in logger.LEVELS
+LEVEL_LABELS = {'debug': 'All', 'info': 'Info', 'error': 'Errors'}
+LEVEL_COLORS = {'debug': (100, 116, 139), 'info': (20, 20, 20), 'error': (239, 68, 68)}
+
+class LogPanel:
+    """
+    Live log view over a bounded ring buffer.
+
+    Records are kept as they arrive and only translated once displayed. The
+    records matching the provider and level filters are kept in a second ring
+    buffer, rebuilt only when a filter changes, and only the lines in view are
+    drawn, from cached surfaces: a frame costs the same with ten records or
+    thousands.
+    """
+
+    def __init__(self, rect, fonts, capacity=LOG_CAPACITY):
+        self.rect = rect
+        self.records = deque(maxlen=capacity)
+        self.view = deque(maxlen=capacity)  # records passing the filters
+        self.providers = []  # in order of appearance, for the provider filter
+        self.provider = None  # None shows every provider
+        self.level = LEVELS[0]
+        self.scroll = 0  # lines scrolled up from the newest one, 0 follows the log
+        self.text_cache = TextCache(fonts, size=self.rows() * 4)
+        self.provider_chip = pygame.Rect(rect.x + 50, rect.y + 6, 150, 22)
+        self.level_chip = pygame.Rect(self.provider_chip.right + 8, rect.y + 6, 110, 22)
+
+    def rows(self):
+        return (self.rect.height - HEADER_HEIGHT) // LINE_HEIGHT
+
+    def matches(self, record):
+        return ((self.provider is None or record.provider == self.provider) and
+                LEVELS.index(record.level) >= LEVELS.index(self.level))
+
+    def add(self, record):
+        self.records.append(record)
+        if record.provider is not None and record.provider not in self.providers:
+            self.providers.append(record.provider)
+        if self.matches(record):
+            self.view.append(record)
+            if self.scroll:
+                # Keep the lines being read in place
+                self.scroll = min(self.scroll + 1, self.max_scroll())
+
+    def refilter(self):
+        self.view = deque((record for record in self.records if self.matches(record)), maxlen=self.records.maxlen)
+        self.scroll = 0
+
+    def max_scroll(self):
+        return max(0, len(self.view) - self.rows())
+
+    def scroll_by(self, lines):
+        self.scroll = min(max(0, self.scroll + lines), self.max_scroll())
+
+    def handle_click(self, pos):
+        """Cycle the filter whose chip was clicked; returns whether the click was for the panel"""
+        if self.provider_chip.collidepoint(pos):
+            choices = [None] + self.providers
+            self.provider = choices[(choices.index(self.provider) + 1) % len(choices)]
+            self.refilter()
+        elif self.level_chip.collidepoint(pos):
+            self.level = LEVELS[(LEVELS.index(self.level) + 1) % len(LEVELS)]
+            self.refilter()
+        return self.rect.collidepoint(pos)
+
+    def draw(self, screen, render_text, colors):
+        pygame.draw.rect(screen, colors['background'], self.rect)
+        pygame.draw.line(screen, colors['border'], self.rect.topleft, self.rect.bottomleft, 1)
+
+        # Header with the filter chips
+        screen.blit(render_text("Log", colors['text']), (self.rect.x + 12, self.rect.y + 8))
+        for chip, label in ((self.provider_chip, self.provider or 'All providers'),
+                            (self.level_chip, LEVEL_LABELS[self.level])):
+            pygame.draw.rect(screen, colors['chip'], chip, border_radius=11)
+            surface = render_text(label, colors['chip_text'], LOG_FONT_SIZE)
+            screen.blit(surface, surface.get_rect(center=chip.center))
+
+        # Only the lines in view, walked from the newest so following the log never scans the history
+        lines = list(islice(reversed(self.view), self.scroll, self.scroll + self.rows()))
+        width = self.rect.width - 20
+        y = self.rect.bottom - len(lines) * LINE_HEIGHT - 4
+        for record in reversed(lines):
+            # Translated here, once per record (LogRecord.text keeps it), for the lines shown only
+            text = record.text().strip().replace('\n', ' ')
+            surface = self.text_cache.render(text, LEVEL_COLORS[record.level], LOG_FONT_SIZE)
+            screen.blit(surface, (self.rect.x + 10, y), pygame.Rect(0, 0, width, LINE_HEIGHT))
+            y += LINE_HEIGHT
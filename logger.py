@@ -1,20 +1,155 @@
+import json
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
 import languages
 
-default_message_queue  = []
+MAX_MESSAGES = 5000
+# Ring buffer of the last records, the oldest dropped in O(1)
+default_message_queue = deque(maxlen=MAX_MESSAGES)
+# Called with every LogRecord, e.g. to forward it from the worker process or show it in the GUI
+listeners = []
+lock = threading.Lock()
 
-def log_message(message):
-    # Translate debug messages
+LEVELS = ('debug', 'info', 'error')
+TAG_PATTERN = re.compile(r'\[([^\]\s]+)\]')
+ERROR_MARKERS = ('[ERROR]', 'Error:', 'Could not', ' failure')
+
+class LogRecord:
+    """One logged message with its context; the text shown to the user is only translated when displayed"""
+
+    def __init__(self, message, provider=None, level=None, stage=None, duration=None):
+        self.time = time.time()
+        self.message = message
+        self.provider = provider if provider is not None else provider_of(message)
+        self.level = level or level_of(message)
+        self.stage = stage
+        self.duration = duration  # seconds
+        self.translated = None
+
+    def text(self):
+        if self.translated is None:
+            self.translated = translate(self.message)
+        return self.translated
+
+    def to_dict(self):
+        return {
+            'time': datetime.fromtimestamp(self.time).isoformat(timespec='milliseconds'),
+            'provider': self.provider,
+            'level': self.level,
+            'stage': self.stage,
+            'duration': self.duration,
+            'message': self.message.strip(),
+        }
+
+    def __getstate__(self):
+        # Sent to the GUI untranslated, it translates for itself
+        state = dict(self.__dict__)
+        state['translated'] = None
+        return state
+
+    def __str__(self):
+        return self.text()
+
+def provider_of(message):
+    """First tag of the message that is not a level, e.g. RVSQ in '[ERROR] [RVSQ] ...'"""
+    return next((tag for tag in TAG_PATTERN.findall(message[:40]) if tag not in ('ERROR', 'DEBUG')), None)
+
+def level_of(message):
+    if message.lstrip().startswith('[DEBUG]'):
+        return 'debug'
+    if any(marker in message for marker in ERROR_MARKERS):
+        return 'error'
+    return 'info'
+
+def translate(message):
+    """Message as displayed, [DEBUG] messages translated"""
     if message.startswith("[DEBUG]"):
         debug_key = message.lower().replace("[debug] ", "debug_")
         translated_message = get_text(debug_key,)
         if translated_message != debug_key:  # If translation exists
-            message = f"[DEBUG] {translated_message}"
-    
-    default_message_queue.append(message)
-    if len(default_message_queue) > 10:
-        default_message_queue.pop(0)
+            return f"[DEBUG] {translated_message}"
+    return message
+
+def log_message(message, provider=None, level=None, stage=None, duration=None):
+    """Log `message`, optionally with the provider, level, stage and duration (s) it is about"""
+    record = LogRecord(message, provider, level, stage, duration)
+    publish(record)
+    if file_sink is not None:
+        file_sink.write(record)
+    return record
+
+def publish(record):
+    """Keep `record` and hand it to the listeners, also for records received from another process"""
+    with lock:
+        default_message_queue.append(record)
+        subscribers = list(listeners)
+    for listener in subscribers:
+        listener(record)
+
+class JsonlWriter:
+    """
+    Background writer of the log records to a JSON Lines file.
+
+    Records are queued by log_message and written on a thread, so logging
+    never waits on the disk; the file is rotated beyond max_bytes, keeping
+    `backups` older files (name.jsonl.1 is the most recent).
+    """
+
+    def __init__(self, path, max_bytes, backups):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.run, name='log-writer', daemon=True)
+        self.thread.start()
+
+    def write(self, record):
+        self.queue.put(record)
+
+    def run(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        while True:
+            record = self.queue.get()
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record.to_dict(), ensure_ascii=False) + '\n')
+                    # Write what else is already queued while the file is open
+                    while True:
+                        try:
+                            f.write(json.dumps(self.queue.get_nowait().to_dict(), ensure_ascii=False) + '\n')
+                        except queue.Empty:
+                            break
+                if self.max_bytes and os.path.getsize(self.path) > self.max_bytes:
+                    self.rotate()
+            except Exception as e:
+                print(f"Could not write log file {self.path}: {str(e)}")
+
+    def rotate(self):
+        for index in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{index}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{index + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+file_sink = None
+
+def start_file_sink(profile, name):
+    """Write the records logged by this process to `name`.jsonl, per the "logging" settings"""
+    global file_sink
+    path = os.path.join(profile['directory'], f"{name}.jsonl")
+    if file_sink is None or file_sink.path != path:
+        file_sink = JsonlWriter(path, profile['max_mb'] * 1024 * 1024, profile['backups'])
+    return file_sink
 
 
 def get_text(key):
     """Get translated text for current language"""
-    return languages.translations.get('English', languages.translations['English']).get(key, key)
\ No newline at end of file
+    return languages.translations.get('English', languages.translations['English']).get(key, key)
@@ -1,22 +1,24 @@
 
+import multiprocessing
 import pygame
 import gui
 
 def main():
     app = gui.AppGUI()
-    clock = pygame.time.Clock()
     
     while app.running:
-        for event in pygame.event.get():
+        # Sleep until something happens: input, the cursor blink or the worker poll timer
+        events = [pygame.event.wait()] + pygame.event.get()
+        for event in events:
             if event.type == pygame.QUIT:
                 app.running = False
             app.handle_event(event)
         
-        app.update()  # Add this line to update cursor blink
-        app.draw()
-        clock.tick(60)
+        app.render()  # only the regions that changed
     
+    app.worker.shutdown()
     pygame.quit()
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # the search worker is spawned from the frozen executable too
     main()
@@ -0,0 +1,116 @@
+import io
+import math
+import os
+import platform
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+import wave
+from array import array
+
+SAMPLE_RATE = 22050
+# Alternating beeps played when a slot is found, as (frequency Hz, duration ms)
+SLOT_ALERT_TONES = [(1000, 500), (2000, 500)] * 3
+
+def synthesize_tones(tones, volume=0.5):
+    """Render a sequence of sine tones into an in-memory 16-bit mono WAV file"""
+    frames = array('h')
+    fade = int(SAMPLE_RATE * 0.005)  # 5 ms ramps avoid clicks between tones
+    for frequency, duration in tones:
+        count = int(SAMPLE_RATE * duration / 1000)
+        for i in range(count):
+            envelope = min(1.0, i / fade, (count - i) / fade) if fade else 1.0
+            sample = volume * envelope * math.sin(2 * math.pi * frequency * i / SAMPLE_RATE)
+            frames.append(int(sample * 32767))
+
+    if sys.byteorder == 'big':
+        frames.byteswap()  # WAV samples are little-endian
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(frames.tobytes())
+    return buffer.getvalue()
+
+class NotificationDispatcher:
+    """
+    Background queue for everything that tells the user about a slot.
+
+    Sounds are handed to a single daemon thread so the automation
+    thread can go straight to booking. The alert is synthesized
+    once; on Windows it is played from memory, elsewhere the whole sequence is
+    played by one player process instead of one process per beep.
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+        self.alert_wav = None
+        self.alert_path = None
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='notifications', daemon=True)
+                self.thread.start()
+
+    def submit(self, kind, **payload):
+        self.start()
+        self.queue.put((kind, payload))
+
+    def slot_alert(self):
+        """Play the slot alert without blocking the caller"""
+        self.submit('sound')
+
+    def run(self):
+        # Synthesize the alert up front so it is ready the moment a slot is found
+        if self.alert_wav is None:
+            self.alert_wav = synthesize_tones(SLOT_ALERT_TONES)
+        while True:
+            kind, payload = self.queue.get()
+            try:
+                if kind == 'sound':
+                    self.play_alert()
+            except Exception as e:
+                print(f"Notification failed: {e}")
+
+    def alert_file(self):
+        """The alert WAV written once to a temporary file, for external players"""
+        if self.alert_path is None:
+            fd, path = tempfile.mkstemp(prefix='meulade_alert_', suffix='.wav')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self.alert_wav)
+            self.alert_path = path
+        return self.alert_path
+
+    def play_alert(self):
+        system = platform.system()
+        try:
+            if system == "Windows":
+                import winsound
+                winsound.PlaySound(self.alert_wav, winsound.SND_MEMORY)
+            elif system == "Darwin":  # macOS
+                subprocess.run(["afplay", self.alert_file()], check=False)
+            elif system == "Linux":
+                # Use paplay or aplay if available
+                for player in ("paplay", "aplay"):
+                    try:
+                        subprocess.run([player, self.alert_file()], check=False)
+                        break
+                    except FileNotFoundError:
+                        continue
+                else:
+                    print("\a")  # Fallback to terminal bell
+            else:
+                print("\a")  # Terminal bell fallback
+        except Exception as e:
+            print(f"Could not play alert: {e}")
+            print("\a")  # Terminal bell fallback
+
+# One per process, see flows.run_flows
+dispatcher = NotificationDispatcher()
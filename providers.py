@@ -0,0 +1,256 @@
+import re
+from datetime import datetime
+from detection import RVSQ_RULES, BONJOURSANTE_RULES
+
+# Declarative description of each clinic portal, run by flows.FlowRunner.
+#
+# A flow lists its stages in order, each a list of steps. A step has an
+# 'action' (goto, click, fill, fill_form, select, check, wait, load, evaluate,
+# first_of, branch) and optionally:
+#   selector   element to act on, inside the stage 'frame' when there is one
+#   field      personal_info key used as the value, passed through 'format'
+#   value      literal value, or a function called when the step runs
+#   budget     name of the "waits" budget used as timeout, default the stage's own budget if any
+#   if/unless  flag (or list of flags) of the flow state the step depends on
+#   retries    extra attempts before the step fails
+#   optional   a failure of the step is logged and ignored
+#   pause      politeness 'action' delay after the step (default after inputs)
+#   log        message logged before the step
+# 'fill_form' sets all its 'fields' (each a selector with a field or value,
+# 'verify': False to skip reading it back) in one round trip;
+# 'first_of' tries its 'steps' in turn, an alternative being a step or a list
+# of steps, starting with the one that worked last time when it has
+# 'remember'; 'branch' runs the 'steps' of the first of its 'options' to show up.
+# Stages before 'results' are checkpoints; a resumable flow restarts after a
+# failure at the deepest one its 'probes' still find on the page.
+
+def format_phone_number(number):
+    if len(number) == 10 and number.isdigit():
+        return f"({number[:3]}) {number[3:6]}-{number[6:]}"
+    raise ValueError("Invalid phone number format")
+
+def validate_email(email):
+    if re.fullmatch(r'[^@\s]+@[^@\s]+\.[^@\s]+', email.strip()):
+        return email.strip()
+    raise ValueError("Invalid email address")
+
+def today():
+    return datetime.today().strftime('%Y-%m-%d')
+
+RVSQ_URL = 'https://rvsq.gouv.qc.ca/prendrerendezvous/Principale.aspx'
+RVSQ_SEARCH_BUTTON = 'button:has-text("Rechercher")'
+
+RVSQ_FLOW = {
+    'name': 'RVSQ',
+    'key': 'rvsq',
+    'rules': RVSQ_RULES,
+    'resumable': False,
+    # Names (substrings) of the cookies recording the cookie consent
+    'consent_cookies': ['consent'],
+    'stages': [
+        {'name': 'form', 'steps': [
+            {'action': 'goto', 'url': RVSQ_URL, 'log': "Navigating to form page..."},
+            {'action': 'click', 'selector': '#btnToutAccepter', 'budget': 'consent', 'unless': 'consent_stored',
+             'optional': True, 'log': "Accepting cookies..."},
+            {'action': 'fill_form', 'name': 'identity_form', 'log': "Filling identity form...", 'fields': [
+                {'selector': '#ctl00_ContentPlaceHolderMP_AssureForm_FirstName', 'field': 'first_name'},
+                {'selector': '#ctl00_ContentPlaceHolderMP_AssureForm_LastName', 'field': 'last_name'},
+                {'selector': '#ctl00_ContentPlaceHolderMP_AssureForm_NAM', 'field': 'nam'},
+                {'selector': '#ctl00_ContentPlaceHolderMP_AssureForm_CardSeqNumber', 'field': 'card_seq_number'},
+                {'selector': '#ctl00_ContentPlaceHolderMP_AssureForm_Day', 'field': 'birth_day'},
+                {'selector': '#ctl00_ContentPlaceHolderMP_AssureForm_Month', 'field': 'birth_month'},
+                {'selector': '#ctl00_ContentPlaceHolderMP_AssureForm_Year', 'field': 'birth_year'},
+                {'selector': '#AssureForm_CSTMT', 'value': True},  # consent checkbox
+            ]},
+            {'action': 'wait', 'selector': '#ctl00_ContentPlaceHolderMP_myButton:not([disabled])', 'budget': 'default',
+             'log': "Waiting for Continue button..."},
+            {'action': 'click', 'selector': '#ctl00_ContentPlaceHolderMP_myButton', 'log': "Clicking Continue button..."},
+        ]},
+        {'name': 'family_doctor', 'steps': [
+            # Whichever of the two family doctor pages shows up
+            {'action': 'branch', 'budget': 'navigation', 'log': "Checking if user has a family doctor...",
+             'error': "Could not determine family doctor status", 'options': [
+                {'selector': "text=pas de médecin de famille", 'set': {'has_family_doctor': False},
+                 'log': "No family doctor detected, proceeding with appointment search...", 'steps': [
+                    {'action': 'click', 'selector': "a.h-SelectAssureBtn.ctx-changer[data-type='3']",
+                     'log': "Clicking proximity button for no family doctor case..."},
+                 ]},
+                {'selector': "a.h-SelectAssureBtn.ctx-changer[data-type='1']", 'set': {'has_family_doctor': True},
+                 'log': "Family doctor detected, proceeding with appointment search...", 'steps': [
+                    {'action': 'click', 'selector': "a.h-SelectAssureBtn.ctx-changer[data-type='1']"},
+                 ]},
+            ]},
+        ]},
+        {'name': 'criteria', 'steps': [
+            {'action': 'wait', 'selector': '#consultingReason', 'budget': 'navigation', 'log': "Waiting for dropdown..."},
+            {'action': 'select', 'selector': '#consultingReason', 'value': 'ac2a5fa4-8514-11ef-a759-005056b11d6c',
+             'log': "Selecting 'Consultation Urgente'..."},
+            {'action': 'wait', 'selector': '#perimeterCombo', 'budget': 'default', 'unless': 'has_family_doctor',
+             'log': "Setting 50km radius..."},
+            {'action': 'click', 'selector': RVSQ_SEARCH_BUTTON, 'log': "Clicking 'Rechercher' button..."},
+            {'action': 'load', 'state': 'networkidle', 'budget': 'navigation'},
+            {'action': 'click', 'if': 'has_family_doctor', 'pause': True, 'log': "Clicking GMF button...",
+             'selector': 'div.thumbnail.tmbArrow.tmbBtn.h-butType2dot2:has-text("Prendre rendez-vous avec un professionnel de la santé de mon groupe de médecine de famille (GMF)")'},
+            {'action': 'click', 'selector': RVSQ_SEARCH_BUTTON, 'log': "Clicking 'Rechercher' again..."},
+            {'action': 'load', 'state': 'networkidle', 'budget': 'navigation'},
+            {'action': 'click', 'if': 'has_family_doctor', 'pause': True, 'log': "Clicking proximity clinic option...",
+             'selector': 'div.thumbnail.tmbArrow.tmbBtn.h-butType3:has-text("Prendre rendez-vous dans une clinique à proximité")'},
+            {'action': 'first_of', 'name': 'perimeter', 'log': "Setting perimeter radius...", 'steps': [
+                {'action': 'select', 'selector': '#perimeterCombo', 'value': '4', 'budget': 'default', 'pause': False},
+                [
+                    {'action': 'click', 'selector': '#perimeterCombo', 'budget': 'default',
+                     'log': "Trying alternative method to set radius..."},
+                    {'action': 'select', 'selector': '#perimeterCombo', 'value': '4', 'budget': 'default', 'pause': False},
+                ],
+                {'action': 'evaluate', 'script': 'document.getElementById("perimeterCombo").value = "4"',
+                 'log': "Using JavaScript to set radius..."},
+            ]},
+        ]},
+    ],
+    'search': {
+        # Every search fills the postal code again and submits the form
+        'submit': [
+            {'action': 'fill', 'selector': '#PostalCode', 'field': 'postal_code', 'log': "Searching for slots..."},
+            {'action': 'click', 'selector': 'button.h-SearchButton.btn.btn-primary:has-text("Rechercher")', 'retries': 1,
+             'log': "Clicking search button..."},
+        ],
+        'settle': 'networkidle',  # the results replace the page, let the network settle before classifying
+        'after_slot': 'continue',
+        # Where the slot records are read from on the results page, see slots.EXTRACT_JS
+        'slots': {
+            'items': ['#clinicsWithDisponibilities .h-ClinicItem', '#clinicsWithDisponibilities li',
+                      '#clinicsWithDisponibilities > div'],
+            'fields': {
+                'clinic': ['h2', 'h3', 'h4', 'strong'],
+                'address': ['address', '.h-ClinicAddress', '.address'],
+                'distance': ['.h-ClinicDistance', '.distance'],
+                'start': ['.h-DisponibilityTime', 'time', '.time'],
+                'kind': ['.h-DisponibilityType', '.type'],
+            },
+        },
+    },
+}
+
+BONJOURSANTE_URL = 'https://bonjour-sante.ca/uno/clinique'
+BONJOURSANTE_IFRAME = "iframe[src*='hub.bonjour-sante.ca']"
+
+BONJOURSANTE_FLOW = {
+    'name': 'BonjourSante',
+    'key': 'bonjoursante',
+    'rules': BONJOURSANTE_RULES,
+    'resumable': True,
+    'frame': BONJOURSANTE_IFRAME,
+    'consent_cookies': ['didomi_token', 'euconsent'],
+    # Stage shown again when the session expired, re-identifying on the same page
+    'session_stage': 'identity',
+    # Elements telling which stage the page is showing, deepest first
+    'probes': [
+        ('results', ['div.title-criteria-container', 'button#continue']),
+        ('criteria', ["input[type='range']"]),
+        ('identity', ['input#healthInsuranceNumber']),
+    ],
+    'stages': [
+        {'name': 'landing', 'steps': [
+            {'action': 'goto', 'url': BONJOURSANTE_URL, 'log': "Navigating to form page..."},
+            {'action': 'click', 'selector': '#didomi-notice-agree-button', 'budget': 'consent',
+             'unless': ['consent_blocked', 'consent_stored'], 'optional': True, 'log': "Accepting cookies..."},
+            {'action': 'click', 'selector': "div[data-test='postalCodeCategoryButton']",
+             'log': "Clicking postal code category button..."},
+            {'action': 'fill_form', 'name': 'postal_code_form', 'log': "Filling postal code form...", 'fields': [
+                {'selector': '#patient-nam-input', 'field': 'card_seq_number'},
+                {'selector': '#postal-code-search-input', 'field': 'postal_code'},
+            ]},
+            {'action': 'click', 'selector': "button[data-test='searchPostalCodeButton']",
+             'log': "Clicking search postal code button..."},
+            {'action': 'wait', 'selector': BONJOURSANTE_IFRAME, 'budget': 'iframe', 'log': "Waiting for iframe to load..."},
+        ]},
+        {'name': 'identity', 'frame': BONJOURSANTE_IFRAME, 'steps': [
+            {'action': 'wait', 'selector': 'input#healthInsuranceNumber', 'budget': 'iframe',
+             'log': "Filling form fields part 2..."},
+            {'action': 'fill_form', 'name': 'identity_form', 'log': "Filling identity form...", 'fields': [
+                {'selector': 'input#healthInsuranceNumber', 'field': 'nam', 'format': lambda nam: "".join(nam.split())},
+                {'selector': 'input#healthInsuranceNumberSequence', 'field': 'card_seq_number'},
+                {'selector': 'input#firstName', 'field': 'first_name'},
+                {'selector': 'input#lastName', 'field': 'last_name'},
+            ]},
+            {'action': 'click', 'selector': 'button#confirm', 'log': "Clicking confirm button..."},
+            {'action': 'wait', 'selector': 'mat-radio-button#mat-radio-2', 'budget': 'iframe',
+             'log': "Waiting for next page to load..."},
+        ]},
+        {'name': 'criteria', 'frame': BONJOURSANTE_IFRAME, 'steps': [
+            {'action': 'click', 'selector': 'mat-radio-button#mat-radio-2', 'pause': True,
+             'log': "Selecting radio button option..."},
+            {'action': 'fill_form', 'name': 'criteria_form', 'log': "Filling date and 50km radius...", 'fields': [
+                # The datepicker shows the date in its own format
+                {'selector': '#mat-input-0', 'value': today, 'verify': False},
+                {'selector': "input[type='range']", 'value': '2'},  # 50km
+            ]},
+            {'action': 'click', 'selector': 'button#confirm', 'log': "Clicking confirm button..."},
+        ]},
+    ],
+    'search': {
+        'frame': BONJOURSANTE_IFRAME,
+        # The criteria stage leaves the search ready, resuming may land on the results directly:
+        # wait for whichever shows up, the continue button still loading after the criteria
+        'enter': [
+            {'action': 'branch', 'budget': 'iframe', 'error': "Neither the search nor its results showed up",
+             'options': [
+                {'selector': 'button#continue', 'log': "Clicking continue button...", 'steps': [
+                    {'action': 'click', 'selector': 'button#continue'},
+                ]},
+                {'selector': 'div.title-criteria-container'},
+            ]},
+        ],
+        'submit': [
+            {'action': 'click', 'selector': 'button#continue'},
+        ],
+        # Steps getting the search form back after each outcome, by slot state
+        'reset': {
+            'no_slots': [
+                {'action': 'click', 'selector': '[data-test="make-new-search"]'},  # Modifier les critères de recherche
+                {'action': 'click', 'selector': 'button#confirm'},
+            ],
+            'server_error': [
+                {'action': 'click', 'selector': 'a.link'},
+                {'action': 'click', 'selector': 'button#confirm'},
+            ],
+        },
+        # A slot that was not booked while it was held is lost, start over
+        'after_slot': 'restart',
+        'on_unknown': 'raise',
+        'slots': {
+            'items': ['app-locked-walkin-availability[data-test="locked-walkin-availability"]'],
+            'fields': {
+                'clinic': ['[data-test="clinic-name"]', 'h2', 'h3', 'strong'],
+                'address': ['[data-test="clinic-address"]', 'address'],
+                'distance': ['[data-test="clinic-distance"]', '.distance'],
+                'start': ['[data-test="availability-time"]', 'time', '.time'],
+                'kind': ['[data-test="availability-type"]', '.type'],
+            },
+        },
+        'book': [
+            {'action': 'click', 'selector': 'button[data-test="confirm-selection-button"]'},
+            {'action': 'wait', 'selector': '#confirmation-checkbox-input'},
+            {'action': 'fill_form', 'name': 'contact_form', 'pause': False, 'fields': [
+                {'selector': 'input#cellPhone', 'field': 'cellphone', 'format': format_phone_number},
+                {'selector': 'input#email', 'field': 'email', 'format': validate_email},
+                {'selector': 'select#reasons', 'value': '28'},  # Reason : Autres
+            ]},
+            # Material checkboxes do not always take a plain click
+            {'action': 'first_of', 'name': 'confirmation_checkbox', 'remember': True, 'steps': [
+                {'action': 'click', 'selector': 'div.mdc-checkbox'},
+                {'action': 'click', 'selector': 'label[for="confirmation-checkbox-input"]'},
+                {'action': 'check', 'selector': '#confirmation-checkbox-input', 'force': True, 'pause': False},
+                {'action': 'evaluate', 'selector': '#confirmation-checkbox-input', 'script': "element => element.click()",
+                 'pause': False},
+            ]},
+            {'action': 'click', 'selector': '#confirm'},
+            {'action': 'click', 'selector': 'button[data-test="registration-dialog-submit-btn"]'},
+            # The registration goes to the server, the only step of the booking not held to the short 'book'
+            # budget: a slow confirmation is still a booking
+            {'action': 'wait', 'selector': 'lib-alert', 'budget': 'navigation'},
+        ],
+    },
+}
+
+FLOWS = {flow['key']: flow for flow in (RVSQ_FLOW, BONJOURSANTE_FLOW)}
@@ -0,0 +1,95 @@
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+from logger import log_message
+from detection import SlotState
+
+def parse_clock(value):
+    hours, minutes = value.split(':')
+    return int(hours) * 60 + int(minutes)
+
+def quiet_until(windows, now):
+    """End of the quiet-hours window `now` falls in, or None; windows may wrap past midnight"""
+    minute = now.hour * 60 + now.minute
+    for start, end in windows:
+        start, end = parse_clock(start), parse_clock(end)
+        if start <= end:
+            inside = start <= minute < end
+        else:
+            inside = minute >= start or minute < end
+        if inside:
+            until = now.replace(hour=end // 60, minute=end % 60, second=0, microsecond=0)
+            return until if until > now else until + timedelta(days=1)
+    return None
+
+class PollScheduler:
+    """
+    Owns the interval between two searches of a provider.
+
+    Searches start at least min_interval and at most max_interval apart
+    (the hard maximum and minimum request rates), normally at a random point
+    of the provider's interval. Consecutive server errors multiply the
+    interval, and quiet-hours windows pause polling until they end.
+    """
+
+    def __init__(self, provider, key, profile, policy):
+        provider_profile = profile[key]
+        self.provider = provider
+        self.interval = provider_profile['interval']
+        self.min_interval = provider_profile['min_interval']
+        self.max_interval = provider_profile['max_interval']
+        self.backoff_factor = profile['server_error_backoff']
+        self.quiet_hours = profile['quiet_hours']
+        self.policy = policy
+        self.server_errors = 0
+        self.last_search = None
+
+    def next_interval(self):
+        """Milliseconds between the start of the last search and the start of the next one"""
+        interval = random.randint(self.interval[0], self.interval[1])
+        if self.server_errors:
+            interval *= self.backoff_factor ** self.server_errors
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def searching(self):
+        """Call when a search is submitted"""
+        self.last_search = time.monotonic()
+
+    def record(self, state):
+        """Adapt the interval to the outcome of the last search"""
+        if state is SlotState.SERVER_ERROR:
+            self.server_errors += 1
+            log_message(f"[{self.provider}] Server error, polling about every {self.next_interval() / 1000:.0f}s")
+        elif state is not SlotState.UNKNOWN and self.server_errors:
+            self.server_errors = 0
+            log_message(f"[{self.provider}] Server answering again, back to the normal polling interval")
+
+    async def wait(self, wake=None):
+        """
+        Sleep until the next search is due and outside of quiet hours.
+
+        Setting the asyncio.Event `wake` ends the wait early, e.g. when a slot
+        is pushed between two searches; returns whether it did.
+        """
+        with self.policy.waiting():
+            until = quiet_until(self.quiet_hours, datetime.now())
+            if until is not None:
+                log_message(f"[{self.provider}] Quiet hours, polling paused until {until.strftime('%H:%M')}")
+                if await sleep((until - datetime.now()).total_seconds(), wake):
+                    return True
+            if self.last_search is not None:
+                due = self.last_search + self.next_interval() / 1000
+                return await sleep(max(0.0, due - time.monotonic()), wake)
+            return False
+
+async def sleep(seconds, wake=None):
+    """Sleep for `seconds`, returning True as soon as the `wake` event is set"""
+    if wake is None:
+        await asyncio.sleep(seconds)
+        return False
+    try:
+        await asyncio.wait_for(wake.wait(), seconds)
+        return True
+    except asyncio.TimeoutError:
+        return False
@@ -0,0 +1,130 @@
+import io
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from logger import log_message
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional, only needed for WebP output
+    Image = None
+
+EXTENSIONS = {'png': 'png', 'jpeg': 'jpg', 'webp': 'webp'}
+
+class ScreenshotWriter:
+    """
+    Background pipeline for screenshots.
+
+    Capturing has to happen on the automation event loop, but it only grabs the
+    bytes (JPEG by default, optionally just the results iframe); encoding to
+    WebP, writing the file and applying the retention policy of the directory
+    are done on a writer thread so the automation loop never stalls on them.
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+        self.profile = None
+
+    def configure(self, profile):
+        """Use the "screenshots" settings for the following captures"""
+        self.profile = profile
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='screenshots', daemon=True)
+                self.thread.start()
+
+    async def capture(self, page, directory, prefix, region=None):
+        """
+        Capture `page` (or only the `region` selector) and queue it for writing.
+
+        Returns the path the screenshot will be written to.
+        """
+        profile = self.profile
+        output_format = profile['format']
+        if output_format == 'webp' and Image is None:
+            output_format = 'jpeg'  # Pillow missing, stay with what Playwright encodes
+
+        options = {'type': 'png' if output_format == 'png' else 'jpeg'}
+        if options['type'] == 'jpeg':
+            options['quality'] = profile['quality']
+
+        if region and await page.locator(region).count() > 0:
+            data = await page.locator(region).first.screenshot(**options)
+        else:
+            data = await page.screenshot(full_page=profile['full_page'], **options)
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+        path = os.path.join(directory, f"{prefix}_{timestamp}.{EXTENSIONS[output_format]}")
+        self.start()
+        self.queue.put((path, data, output_format))
+        return path
+
+    def save(self, path, data):
+        """Queue other artifacts (HTML snapshots) for the same writer and retention policy"""
+        self.start()
+        self.queue.put((path, data, None))
+
+    def run(self):
+        while True:
+            path, data, output_format = self.queue.get()
+            try:
+                if output_format == 'webp':
+                    data = self.to_webp(data)
+                directory = os.path.dirname(path)
+                os.makedirs(directory, exist_ok=True)
+                with open(path, 'wb') as f:
+                    f.write(data)
+                log_message(f"{'Screenshot' if output_format else 'Snapshot'} saved: {path}")
+                self.enforce_retention(directory)
+            except Exception as e:
+                print(f"Could not save screenshot {path}: {e}")
+            finally:
+                self.queue.task_done()
+
+    def wait(self):
+        """Block until every queued screenshot has been written"""
+        self.queue.join()
+
+    def to_webp(self, data):
+        image = Image.open(io.BytesIO(data))
+        output = io.BytesIO()
+        image.save(output, format='WEBP', quality=self.profile['quality'])
+        return output.getvalue()
+
+    def enforce_retention(self, directory):
+        """Delete the oldest files of `directory` beyond the age, count and size limits"""
+        retention = self.profile['retention']
+        entries = []
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if os.path.isfile(path):
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        max_age = retention['max_age_days'] * 86400
+        max_bytes = retention['max_mb'] * 1024 * 1024
+        total = sum(size for _, size, _ in entries)
+        now = time.time()
+        while entries:
+            mtime, size, path = entries[0]
+            too_old = max_age and now - mtime > max_age
+            too_many = retention['max_files'] and len(entries) > retention['max_files']
+            too_big = max_bytes and total > max_bytes
+            if not (too_old or too_many or too_big):
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+            entries.pop(0)
+
+# One per process, see flows.run_flows
+writer = ScreenshotWriter()
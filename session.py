@@ -0,0 +1,227 @@
+from playwright.async_api import async_playwright
+import asyncio
+import os
+import shutil
+import sys
+from logger import log_message
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36'
+DEFAULT_TIMEOUT = 60000  # increase from 30 sec to 60 secs for general timeout
+LAUNCH_ARGS = ['--disable-redirect-limits']
+# Profile directories Firefox rebuilds by itself, dropped when a profile outgrows its cap
+DISPOSABLE_PROFILE_DIRS = ('cache2', 'startupCache', 'thumbnails', 'crashes', 'minidumps')
+
+def get_playwright_path():
+    """Get the correct path for Playwright resources when bundled"""
+    if getattr(sys, 'frozen', False):
+        return {
+            'browser_path': sys._MEIPASS  # Just use the base directory
+        }
+    return None
+
+def directory_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+def trim_profile(path, max_mb):
+    """Empty the caches of the profile at `path` when it takes more than `max_mb`"""
+    size = directory_size(path)
+    if not max_mb or size <= max_mb * 1024 * 1024:
+        return
+    for name in DISPOSABLE_PROFILE_DIRS:
+        shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+    log_message(f"[DEBUG] Browser profile {os.path.basename(path)} reached {size / 1024 / 1024:.0f} MB, cache cleared")
+
+def cache_prefs(max_mb):
+    """Firefox preferences holding the HTTP cache of a profile to half its size cap"""
+    if not max_mb:
+        return {}
+    return {
+        'browser.cache.disk.smart_size.enabled': False,
+        'browser.cache.disk.capacity': max_mb * 1024 // 2,  # KB
+    }
+
+class BrowserManager:
+    """
+    Owns one Playwright driver and one Firefox instance for a whole search session.
+
+    Every provider runs as a coroutine on the same event loop and gets its own
+    context on the shared browser, keyed by the provider name. Retries ask for
+    a fresh context instead of relaunching Firefox; the browser is only
+    restarted when it has crashed or been disconnected.
+
+    With the "profile" setting enabled, each provider instead runs in a
+    persistent context on its own Firefox user-data directory, so the HTTP
+    cache, cookies and stored consent survive relaunches. That context is
+    its browser: retries reuse it with a fresh page and without the session
+    cookies, it is only relaunched when it has crashed.
+    """
+
+    def __init__(self, headless=False, profile=None):
+        self.headless = headless
+        self.profile = profile if profile and profile['enabled'] else None
+        self.playwright = None
+        self.browser = None
+        self.contexts = {}  # owner -> its current context
+        self.launch_lock = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.stop()
+
+    async def start(self):
+        """Start the Playwright driver if it is not already running"""
+        if self.playwright is None:
+            playwright_paths = get_playwright_path()
+            if playwright_paths:
+                os.environ['PLAYWRIGHT_BROWSERS_PATH'] = playwright_paths['browser_path']
+            self.playwright = await async_playwright().start()
+            self.launch_lock = asyncio.Lock()
+        return self
+
+    def is_alive(self, owner=None):
+        """Whether the current browser process is still connected; on profiles, whether `owner`'s is"""
+        if self.profile is not None:
+            return owner in self.contexts
+        return self.browser is not None and self.browser.is_connected()
+
+    async def ensure_browser(self):
+        """Return the running browser, launching it only if needed"""
+        await self.start()
+        # Providers failing at the same time must not launch a browser each
+        async with self.launch_lock:
+            if self.is_alive():
+                return self.browser
+
+            if self.browser is not None:
+                log_message("[DEBUG] Browser disconnected, relaunching...")
+                self.contexts = {}
+                try:
+                    await self.browser.close()
+                except Exception:
+                    pass
+
+            log_message("[DEBUG] Starting browser automation...")
+            self.browser = await self.playwright.firefox.launch(
+                headless=self.headless,
+                args=LAUNCH_ARGS
+            )
+            return self.browser
+
+    async def new_context(self, owner, **options):
+        """Fresh context for `owner`: a new one on the shared browser, or its persistent one cleaned up"""
+        options.setdefault('user_agent', USER_AGENT)
+        if self.profile is not None:
+            context = await self.profile_context(owner, options)
+        else:
+            await self.close_context(owner)
+            browser = await self.ensure_browser()
+            context = await browser.new_context(**options)
+        context.set_default_timeout(DEFAULT_TIMEOUT)
+        self.contexts[owner] = context
+        return context
+
+    async def profile_context(self, owner, options):
+        """
+        Persistent context of `owner`, reused while its browser runs.
+
+        A reused context loses its pages and session cookies, as a relaunch
+        would, and keeps the rest of its storage; the profile keeps its own
+        storage, only the session cookies of a checkpoint need restoring.
+        """
+        storage_state = options.pop('storage_state', None)
+        context = self.contexts.get(owner)
+        try:
+            if context is None:
+                context = await self.launch_profile(owner, options)
+            else:
+                for page in list(context.pages):
+                    await page.close()
+                kept = [cookie for cookie in await context.cookies() if cookie.get('expires', -1) != -1]
+                await context.clear_cookies()
+                if kept:
+                    await context.add_cookies(kept)
+        except Exception:
+            if context is None:
+                raise
+            # The browser went away while being reused, launch it again
+            log_message(f"[DEBUG] Browser of profile {owner} not responding, relaunching...")
+            await self.close_context(owner)
+            context = await self.launch_profile(owner, options)
+        if storage_state:
+            await context.add_cookies(storage_state.get('cookies', []))
+        return context
+
+    async def launch_profile(self, owner, options):
+        """Persistent context of `owner` on its user-data directory, trimmed to the size cap first"""
+        await self.start()
+        path = os.path.abspath(os.path.join(self.profile['directory'], owner))
+        os.makedirs(path, exist_ok=True)
+        trim_profile(path, self.profile['max_mb'])
+
+        log_message(f"[DEBUG] Starting browser automation on profile {owner}...")
+        context = await self.playwright.firefox.launch_persistent_context(
+            path,
+            headless=self.headless,
+            args=LAUNCH_ARGS,
+            firefox_user_prefs=cache_prefs(self.profile['max_mb']),
+            **options
+        )
+
+        def closed(_):
+            # The persistent context is the whole browser, a crash closes it
+            if self.contexts.get(owner) is context:
+                del self.contexts[owner]
+        context.on('close', closed)
+        return context
+
+    async def new_page(self, owner, **options):
+        """Fresh context with a single page, ready for a new pass of a provider"""
+        context = await self.new_context(owner, **options)
+        # A persistent context opens with its first page
+        if context.pages:
+            return context.pages[0]
+        return await context.new_page()
+
+    async def release(self, owner):
+        """
+        End the current pass of `owner`: its context is closed, except a
+        persistent one, kept running for new_context to reuse.
+        """
+        if self.profile is None:
+            await self.close_context(owner)
+
+    async def close_context(self, owner):
+        """Close the current context of `owner`, ignoring errors from an already dead browser"""
+        context = self.contexts.pop(owner, None)
+        if context is not None:
+            try:
+                await context.close()
+            except Exception:
+                pass
+
+    async def stop(self):
+        """Tear down the contexts, the browser and the driver"""
+        for owner in list(self.contexts):
+            await self.close_context(owner)
+        if self.browser is not None:
+            try:
+                await self.browser.close()
+            except Exception:
+                pass
+            self.browser = None
+        if self.playwright is not None:
+            try:
+                await self.playwright.stop()
+            except Exception:
+                pass
+            self.playwright = None
@@ -0,0 +1,155 @@
+import copy
+
+# Defaults for the automation, overridable from the "settings" section of config.json
+DEFAULT_SETTINGS = {
+    # Providers searched together on the same browser, see providers.FLOWS
+    'providers': ['bonjoursante'],
+    'profile': {
+        # Run each provider on a persistent Firefox profile, keeping its HTTP cache,
+        # cookies and cookie consent from one launch to the next; each provider then
+        # has its own Firefox, kept running across retries
+        'enabled': False,
+        'directory': 'browser_profile',  # one subdirectory per provider
+        'max_mb': 300,  # per provider; the HTTP cache is held to half of it
+    },
+    'detection': {
+        # 'dom' scrapes the results page, 'network' reads the availability API responses
+        'mode': 'dom',
+        # Push slot alerts from an in-page MutationObserver instead of waiting for the next poll
+        'observer': False,
+        # ms to wait for a pushed result after a search before classifying the page itself;
+        # kept short, a URL pattern that never matches costs this on every search
+        'response_timeout': 5000,
+        'url_patterns': {
+            'rvsq': ['/disponibilit', '/availabilit', 'RechercheDisponibilite'],
+            'bonjoursante': ['/availabilit', '/walkin', '/disponibilit'],
+        },
+    },
+    'waits': {
+        # Timeouts in ms for condition-based waits, by step
+        'budgets': {
+            'default': 15000,
+            'navigation': 60000,
+            'consent': 10000,
+            'iframe': 30000,
+            'results': 60000,
+            # Every step of an autobooking, a held slot cannot wait for a 60 s timeout to fall back
+            'book': 5000,
+        },
+        # The only fixed delays, in ms; [min, max] picks a random value
+        'delays': {
+            'action': 0,  # between form actions, raised to the action delay in testing mode
+            'slot_hold': 240000,  # keep a found slot on screen for the user to book it
+        },
+        'log_cycle_timing': True,
+    },
+    'polling': {
+        # ms between the starts of two searches: a random point of 'interval', never
+        # less than 'min_interval' nor more than 'max_interval' (hard max and min rates)
+        'rvsq': {'interval': [1000, 5000], 'min_interval': 1000, 'max_interval': 300000},
+        'bonjoursante': {'interval': [2000, 10000], 'min_interval': 2000, 'max_interval': 300000},
+        'server_error_backoff': 2.0,  # interval multiplier per consecutive server error
+        # Local times polling is paused, e.g. [["01:00", "06:00"]]
+        'quiet_hours': [],
+    },
+    'blocking': {
+        'enabled': True,
+        # Playwright resource types never needed by the automation
+        'resource_types': ['image', 'font', 'media'],
+        # URL substrings of analytics, tracking and consent widgets
+        'blocked_hosts': [
+            'google-analytics.com', 'googletagmanager.com', 'doubleclick.net',
+            'facebook.net', 'connect.facebook', 'hotjar.com', 'clarity.ms',
+            'bat.bing.com', 'nr-data.net', 'newrelic.com',
+            'didomi', 'privacy-center.org',
+        ],
+        # URL substrings always let through, by provider
+        'allow': {
+            'rvsq': [],
+            'bonjoursante': [],
+        },
+        # Average size in bytes of a blocked request, used to estimate the savings
+        'typical_bytes': {
+            'image': 30000,
+            'font': 40000,
+            'media': 200000,
+            'script': 60000,
+            'stylesheet': 20000,
+            'other': 5000,
+        },
+        'log_stats': True,
+    },
+    'screenshots': {
+        # 'jpeg' and 'png' are encoded by Playwright, 'webp' needs Pillow (falls back to JPEG)
+        'format': 'jpeg',
+        'quality': 70,
+        'full_page': True,
+        # Selector to capture instead of the whole page, by provider (None for the page)
+        'region': {
+            'rvsq': None,
+            'bonjoursante': "iframe[src*='hub.bonjour-sante.ca']",
+        },
+        # Oldest files of a screenshot directory are deleted beyond these limits (0 disables one)
+        'retention': {
+            'max_files': 200,
+            'max_mb': 200,
+            'max_age_days': 14,
+        },
+    },
+    'supervisor': {
+        # Seconds before the first restart by kind of failure, doubled on each consecutive failure;
+        # 'unwanted' is the fixed pause before restarting to release a slot the preferences filter out
+        'base_delay': {'transient': 5, 'selector': 30, 'session': 1, 'unwanted': 60},
+        'max_delay': 600,
+        'jitter': 0.3,  # up to 30% shorter, so providers do not restart in lockstep
+        # Identical failures in a row opening the circuit, and how long the provider then pauses (s)
+        'breaker_threshold': 5,
+        'breaker_cooldown': 1800,
+    },
+    'preferences': {
+        # Slots outside these are not alerted nor booked (None or [] disables a filter)
+        'max_distance_km': None,
+        'time_window': [],  # local start times, e.g. ["08:00", "18:00"]
+        'max_hours_ahead': None,
+        'types': [],  # words of the appointment type, e.g. ["urgent"]
+        # Also reject slots the page does not give the filtered field of
+        'strict': False,
+    },
+    'booking': {
+        # Alternative of each 'remember' first_of step that worked last, tried first next time
+        'strategies': 'booking_strategies.json',
+    },
+    'seen_slots': {
+        # Slots already alerted, never alerted or booked again until they expire from the index
+        'path': 'seen_slots.json',
+        'ttl': 21600,  # s
+    },
+    'logging': {
+        # Log records of each process as JSON Lines (search.jsonl, gui.jsonl), rotated beyond max_mb
+        'directory': 'logs',
+        'max_mb': 5,
+        'backups': 3,
+    },
+    'artifacts': {
+        'directory': 'error_screenshots',
+        # Distinct failures saved per hour; repeats of a recorded failure are only counted
+        'max_per_hour': 10,
+        'screenshot': True,  # screenshot next to the HTML snapshot
+        # Keep a Playwright trace of this many last cycles, saved with each failure (0 disables)
+        'trace_cycles': 0,
+    },
+}
+
+def merge_settings(defaults, overrides):
+    """Recursively merge `overrides` on top of a copy of `defaults`"""
+    merged = copy.deepcopy(defaults)
+    for key, value in (overrides or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_settings(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+def load_settings(config):
+    """Settings for a search, defaults completed by the config's "settings" section"""
+    return merge_settings(DEFAULT_SETTINGS, config.get('settings', {}))
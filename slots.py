@@ -0,0 +1,238 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from logger import log_message
+from scheduler import parse_clock
+
+# One pass over the results: the text of every slot item and of its fields.
+# Field selectors are lists tried in order inside each item.
+EXTRACT_JS = """
+(root, spec) => {
+    const doc = root.ownerDocument || document;
+    const normalize = (text) => (text || '').replace(/\\s+/g, ' ').trim();
+    const items = [];
+    for (const selector of spec.items) {
+        items.push(...doc.querySelectorAll(selector));
+        if (items.length) {
+            break;
+        }
+    }
+    return items.map((item) => {
+        const record = {text: normalize(item.innerText || item.textContent)};
+        for (const [field, selectors] of Object.entries(spec.fields)) {
+            const found = selectors.map((selector) => item.querySelector(selector)).find((el) => el);
+            record[field] = found ? normalize(found.innerText || found.textContent) : null;
+        }
+        return record;
+    });
+}
+"""
+
+DISTANCE_PATTERN = re.compile(r'(\d+(?:[.,]\d+)?)\s*km', re.I)
+TIME_PATTERN = re.compile(r'\b([01]?\d|2[0-3])\s*(?:h|:)\s*([0-5]\d)\b', re.I)
+DATE_PATTERN = re.compile(r'\b(\d{4})-(\d{2})-(\d{2})')
+
+# Keys of availability API records, lowercase, by field
+PAYLOAD_KEYS = {
+    'clinic': ('clinicname', 'clinic', 'establishmentname', 'name', 'nom'),
+    'address': ('address', 'adresse', 'fulladdress'),
+    'distance': ('distance', 'distancekm'),
+    'start': ('start', 'startdate', 'starttime', 'datetime', 'date', 'heure'),
+    'kind': ('type', 'appointmenttype', 'servicetype', 'reason'),
+}
+
+def parse_distance(text):
+    match = DISTANCE_PATTERN.search(text or '')
+    return float(match.group(1).replace(',', '.')) if match else None
+
+def parse_start(text, now=None):
+    """Start time of a slot from its text; a time without a date is the next such time from now"""
+    if not text:
+        return None
+    try:
+        start = datetime.fromisoformat(text.strip().replace('Z', '+00:00'))
+        # Compared with local times, an offset is converted rather than dropped
+        return start.astimezone().replace(tzinfo=None) if start.tzinfo is not None else start
+    except ValueError:
+        pass
+    now = now or datetime.now()
+    match = TIME_PATTERN.search(text)
+    if not match:
+        return None
+    date = DATE_PATTERN.search(text)
+    day = datetime(*map(int, date.groups())) if date else now.replace(hour=0, minute=0, second=0, microsecond=0)
+    start = day.replace(hour=int(match.group(1)), minute=int(match.group(2)))
+    if not date and start < now - timedelta(hours=1):
+        start += timedelta(days=1)
+    return start
+
+class SlotRecord:
+    """One slot offered by a provider"""
+
+    def __init__(self, provider, clinic=None, address=None, distance=None, start=None, kind=None, text=''):
+        self.provider = provider
+        self.clinic = clinic
+        self.address = address
+        self.distance = distance  # km
+        self.start = start  # datetime
+        self.kind = kind
+        self.text = text
+
+    def key(self):
+        """Identity of the slot in the seen-slot index"""
+        if self.clinic or self.start:
+            identity = f"{self.clinic}|{self.address}|{self.start.isoformat() if self.start else ''}|{self.kind}"
+        else:
+            identity = self.text
+        return f"{self.provider}:" + hashlib.sha1(identity.encode('utf-8')).hexdigest()[:16]
+
+    def describe(self):
+        parts = [self.clinic or 'Unknown clinic']
+        if self.distance is not None:
+            parts.append(f"{self.distance:g} km")
+        if self.start is not None:
+            parts.append(self.start.strftime('%Y-%m-%d %H:%M'))
+        if self.kind:
+            parts.append(self.kind)
+        return ", ".join(parts)
+
+    def __repr__(self):
+        return f"SlotRecord({self.describe()})"
+
+def record_from_item(provider, item):
+    """SlotRecord from one item returned by EXTRACT_JS"""
+    text = item.get('text') or ''
+    distance = parse_distance(item.get('distance')) if item.get('distance') else parse_distance(text)
+    start = parse_start(item.get('start')) or parse_start(text)
+    return SlotRecord(provider, clinic=item.get('clinic'), address=item.get('address'), distance=distance,
+                      start=start, kind=item.get('kind'), text=text)
+
+def record_from_payload(provider, entry):
+    """SlotRecord from one entry of an availability API response"""
+    if not isinstance(entry, dict):
+        return SlotRecord(provider, text=json.dumps(entry, sort_keys=True, default=str))
+    values = {key.lower(): value for key, value in entry.items()}
+    found = {}
+    for field, keys in PAYLOAD_KEYS.items():
+        found[field] = next((values[key] for key in keys if values.get(key) not in (None, '')), None)
+    distance = found['distance']
+    if not isinstance(distance, (int, float)):
+        distance = parse_distance(f"{distance} km") if distance is not None else None
+    clinic = found['clinic']
+    if isinstance(clinic, dict):
+        clinic = clinic.get('name') or clinic.get('nom')
+    address = found['address']
+    if isinstance(address, dict):
+        address = ", ".join(str(value) for value in address.values() if value)
+    return SlotRecord(provider, clinic=clinic, address=address, distance=distance,
+                      start=parse_start(str(found['start'])) if found['start'] else None,
+                      kind=found['kind'] if isinstance(found['kind'], str) else None,
+                      text=json.dumps(entry, sort_keys=True, default=str))
+
+async def extract_slots(provider, root, spec):
+    """Slot records of the results page in a single evaluate; `root` is a locator in the results document"""
+    items = await root.evaluate(EXTRACT_JS, spec)
+    return [record_from_item(provider, item) for item in items]
+
+def in_time_window(start, window):
+    """Whether the time of day of `start` is in `window`, two "HH:MM" included; windows may wrap past midnight"""
+    minute = start.hour * 60 + start.minute
+    first, last = (parse_clock(value) for value in window)
+    if first <= last:
+        return first <= minute <= last
+    return minute >= first or minute <= last
+
+def matches_preferences(record, preferences, now=None):
+    """
+    Whether `record` fits the "preferences" settings.
+
+    A field the page did not show cannot rule a slot out, unless 'strict' is set.
+    """
+    strict = preferences['strict']
+    max_distance = preferences['max_distance_km']
+    if max_distance is not None:
+        if record.distance is None:
+            if strict:
+                return False
+        elif record.distance > max_distance:
+            return False
+
+    window = preferences['time_window']
+    max_hours = preferences['max_hours_ahead']
+    if record.start is None:
+        if strict and (window or max_hours is not None):
+            return False
+    else:
+        if window and not in_time_window(record.start, window):
+            return False
+        if max_hours is not None and record.start > (now or datetime.now()) + timedelta(hours=max_hours):
+            return False
+
+    kinds = preferences['types']
+    if kinds:
+        if record.kind is None:
+            if strict:
+                return False
+        elif not any(kind.lower() in record.kind.lower() for kind in kinds):
+            return False
+    return True
+
+class SeenSlots:
+    """
+    Persistent index of the slots already notified, so a slot alerts or is booked once.
+
+    Entries expire after `ttl` seconds; the index is a small JSON file shared
+    by every provider of the worker.
+    """
+
+    def __init__(self, path, ttl):
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.seen = {}  # slot key -> time first notified
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                self.seen = json.load(f)
+        except (OSError, ValueError):
+            self.seen = {}
+        self.prune()
+
+    def prune(self):
+        cutoff = time.time() - self.ttl
+        self.seen = {key: seen_at for key, seen_at in self.seen.items() if seen_at >= cutoff}
+
+    def save(self):
+        try:
+            with open(self.path, 'w') as f:
+                json.dump(self.seen, f)
+        except OSError as e:
+            log_message(f"Could not save the seen slots: {str(e)}")
+
+    def fresh(self, records):
+        """Records not notified within the TTL"""
+        with self.lock:
+            self.prune()
+            return [record for record in records if record.key() not in self.seen]
+
+    def mark(self, records):
+        with self.lock:
+            now = time.time()
+            for record in records:
+                self.seen.setdefault(record.key(), now)
+            self.save()
+
+indexes = {}
+
+def seen_slots(path, ttl):
+    """The index stored at `path`, one instance per file"""
+    path = os.path.abspath(path)
+    if path not in indexes:
+        indexes[path] = SeenSlots(path, ttl)
+    return indexes[path]
@@ -0,0 +1,115 @@
+import random
+import re
+import time
+from logger import log_message
+from checkpoints import SessionExpired, PageChanged, SlotExpired, SlotNotWanted
+
+# Called with (provider, state, detail) when a provider's circuit opens or closes
+state_listeners = []
+
+# Error messages of a browser or network problem rather than of the page
+NETWORK_MARKERS = (
+    'net::', 'NS_ERROR', 'NS_BINDING', 'Target closed', 'has been closed', 'Connection closed',
+    'ECONNRESET', 'ECONNREFUSED',
+)
+
+def classify_failure(error):
+    """
+    Kind of failure behind `error`:
+
+    'unwanted'  restart releasing a slot not wanted, spaced out while such slots stay listed
+    'restart'   expected restart (slot not booked in time), no delay
+    'session'   the provider sent us back to its identification form
+    'selector'  an element or outcome the flow expects is missing, the site may have changed
+    'transient' network, browser or server trouble, anything else
+    """
+    if isinstance(error, SlotNotWanted):
+        return 'unwanted'
+    if isinstance(error, SlotExpired):
+        return 'restart'
+    if isinstance(error, SessionExpired):
+        return 'session'
+    if isinstance(error, PageChanged):
+        return 'selector'
+    message = str(error)
+    if any(marker in message for marker in NETWORK_MARKERS):
+        return 'transient'
+    if type(error).__name__ == 'TimeoutError' and ('waiting for locator' in message or 'waiting for selector' in message):
+        return 'selector'
+    if 'strict mode violation' in message:
+        return 'selector'
+    return 'transient'
+
+class Supervisor:
+    """
+    Restart policy of one provider.
+
+    After a failure the provider waits for an exponential backoff with jitter,
+    starting from a base delay that depends on the kind of failure. When the
+    same failure (kind, stage and message) keeps happening, the circuit opens:
+    the provider is paused for a cooldown and the GUI is told, then it gets
+    one attempt; the circuit closes again on the first success.
+    """
+
+    def __init__(self, provider, profile):
+        self.provider = provider
+        self.base_delay = profile['base_delay']
+        self.max_delay = profile['max_delay']
+        self.jitter = profile['jitter']
+        self.threshold = profile['breaker_threshold']
+        self.cooldown = profile['breaker_cooldown']
+        self.failures = 0  # consecutive failures, for the backoff
+        self.signature = None
+        self.repeats = 0  # consecutive identical failures, for the breaker
+        self.open_until = None
+
+    def signature_of(self, kind, stage, error):
+        message = str(error).strip().splitlines()[0] if str(error).strip() else type(error).__name__
+        return f"{kind}|{stage}|{re.sub(r'[0-9]+', '0', message)}"
+
+    def backoff(self, kind):
+        """Exponential delay from the base delay of `kind`, jittered to spread restarts out"""
+        delay = min(self.max_delay, self.base_delay[kind] * 2 ** (self.failures - 1))
+        return delay * random.uniform(1 - self.jitter, 1)
+
+    def failed(self, error, stage):
+        """Record a failure and return how many seconds to wait before the next attempt"""
+        kind = classify_failure(error)
+        if kind == 'restart':
+            return 0
+        if kind == 'unwanted':
+            # Not the site failing, no backoff nor circuit, only a pause before the setup is redone
+            delay = self.base_delay[kind] * random.uniform(1 - self.jitter, 1)
+            log_message(f"[{self.provider}] Only unwanted slots listed, searching again in {delay:.0f}s")
+            return delay
+
+        self.failures += 1
+        signature = self.signature_of(kind, stage, error)
+        if signature == self.signature:
+            self.repeats += 1
+        else:
+            self.signature = signature
+            self.repeats = 1
+
+        if self.threshold and self.repeats >= self.threshold:
+            self.open_until = time.time() + self.cooldown
+            detail = f"{kind} failure at '{stage}' {self.repeats} times in a row"
+            log_message(f"[{self.provider}] Circuit open after {detail}, pausing for {self.cooldown // 60} min")
+            for listener in state_listeners:
+                listener(self.provider, 'open', detail)
+            return self.cooldown
+
+        delay = self.backoff(kind)
+        log_message(f"[{self.provider}] {kind.capitalize()} failure, retrying in {delay:.0f}s")
+        return delay
+
+    def succeeded(self):
+        """Reset the backoff, and close the circuit if it was open"""
+        self.failures = 0
+        self.signature = None
+        self.repeats = 0
+        if self.open_until is not None:
+            self.open_until = None
+            log_message(f"[{self.provider}] Circuit closed, back to normal")
+            for listener in state_listeners:
+                listener(self.provider, 'closed', '')
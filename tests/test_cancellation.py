@@ -0,0 +1,67 @@
+import asyncio
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cancellation import CancelToken
+
+def test_cancel_calls_callbacks_once():
+    token = CancelToken()
+    calls = []
+    token.on_cancel(lambda: calls.append('first'))
+    remove = token.on_cancel(lambda: calls.append('removed'))
+    remove()
+    token.cancel()
+    token.cancel()
+    assert calls == ['first']
+    assert not token.get()
+    assert token.state == 'cancelled'
+    # Registered after the fact, called right away
+    token.on_cancel(lambda: calls.append('late'))
+    assert calls == ['first', 'late']
+
+def test_reset_makes_the_token_usable_again():
+    token = CancelToken()
+    token.set(False)
+    token.set(True)
+    assert token.get()
+    assert token.state == 'running'
+
+def test_pause_does_not_apply_to_a_cancelled_token():
+    token = CancelToken()
+    token.cancel()
+    token.pause()
+    assert token.state == 'cancelled'
+
+def test_sleep_returns_early_when_cancelled():
+    token = CancelToken()
+    assert token.sleep(0) is False
+    threading.Timer(0.05, token.cancel).start()
+    assert token.sleep(5) is True
+
+def test_wait_if_paused_wakes_on_resume_from_another_thread():
+    async def main():
+        token = CancelToken()
+        await asyncio.wait_for(token.wait_if_paused(), 1)  # running, returns at once
+        token.pause()
+        assert token.state == 'paused'
+        waiting = asyncio.create_task(token.wait_if_paused())
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        threading.Timer(0.05, token.resume).start()
+        await asyncio.wait_for(waiting, 1)
+        assert token.waiters == []
+    asyncio.run(main())
+
+def test_wait_if_paused_wakes_on_cancel():
+    async def main():
+        token = CancelToken()
+        token.pause()
+        waiting = asyncio.create_task(token.wait_if_paused())
+        await asyncio.sleep(0.05)
+        token.cancel()
+        await asyncio.wait_for(waiting, 1)
+        assert not token.get()
+    asyncio.run(main())
@@ -0,0 +1,29 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detection import SlotState, parse_availability_payload
+
+def test_nested_availability_lists_are_found():
+    payload = {'data': {'clinics': [{'name': 'A', 'availabilities': [{'start': '09:00'}, {'start': '09:15'}]},
+                                    {'name': 'B', 'walkinSlots': [{'start': '10:00'}]}]}}
+    result = parse_availability_payload(payload, url='https://example.test/availabilities')
+    assert result.state is SlotState.SLOT_FOUND
+    assert len(result.slots) == 3
+    assert result.source == 'network'
+
+def test_empty_availability_list_means_no_slots():
+    assert parse_availability_payload({'availabilities': []}).state is SlotState.NO_SLOTS
+    assert parse_availability_payload({'result': {'disponibilites': []}}).state is SlotState.NO_SLOTS
+
+def test_list_of_strings_is_not_slots():
+    # e.g. the slot types a clinic offers, sent with an empty result
+    result = parse_availability_payload({'availabilityTypes': ['urgent', 'suivi'], 'availabilities': []})
+    assert result.state is SlotState.NO_SLOTS
+    assert parse_availability_payload({'availabilityTypes': ['urgent', 'suivi']}).state is SlotState.UNKNOWN
+
+def test_payload_without_availability_key_is_unknown():
+    assert parse_availability_payload({'user': {'name': 'A'}}).state is SlotState.UNKNOWN
+    assert parse_availability_payload([]).state is SlotState.UNKNOWN
+    assert parse_availability_payload('not json').state is SlotState.UNKNOWN
@@ -0,0 +1,28 @@
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import quiet_until
+
+def test_outside_quiet_hours():
+    assert quiet_until([['01:00', '06:00']], datetime(2026, 3, 10, 12, 0)) is None
+    assert quiet_until([], datetime(2026, 3, 10, 3, 0)) is None
+
+def test_within_a_same_day_window():
+    assert quiet_until([['01:00', '06:00']], datetime(2026, 3, 10, 3, 30)) == datetime(2026, 3, 10, 6, 0)
+    # The end itself is outside the window
+    assert quiet_until([['01:00', '06:00']], datetime(2026, 3, 10, 6, 0)) is None
+
+def test_window_wrapping_past_midnight():
+    windows = [['23:00', '06:30']]
+    assert quiet_until(windows, datetime(2026, 3, 10, 23, 15)) == datetime(2026, 3, 11, 6, 30)
+    assert quiet_until(windows, datetime(2026, 3, 11, 2, 0)) == datetime(2026, 3, 11, 6, 30)
+    assert quiet_until(windows, datetime(2026, 3, 11, 6, 30)) is None
+    assert quiet_until(windows, datetime(2026, 3, 10, 22, 59)) is None
+
+def test_first_matching_window_wins():
+    windows = [['12:00', '13:00'], ['22:00', '07:00']]
+    assert quiet_until(windows, datetime(2026, 3, 10, 12, 30)) == datetime(2026, 3, 10, 13, 0)
+    assert quiet_until(windows, datetime(2026, 3, 10, 22, 0)) == datetime(2026, 3, 11, 7, 0)
@@ -0,0 +1,55 @@
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from settings import DEFAULT_SETTINGS
+from slots import SlotRecord, matches_preferences, parse_start
+
+NOW = datetime(2026, 3, 10, 12, 0)
+
+def preferences(**overrides):
+    return dict(DEFAULT_SETTINGS['preferences'], **overrides)
+
+def slot(start=None, kind=None, distance=None):
+    return SlotRecord('rvsq', clinic='Clinic', start=start, kind=kind, distance=distance)
+
+def test_type_filter_applies_without_start_time():
+    prefs = preferences(types=['urgent'])
+    assert not matches_preferences(slot(kind='Suivi'), prefs, NOW)
+    assert not matches_preferences(slot(NOW, kind='Suivi'), prefs, NOW)
+    assert matches_preferences(slot(kind='Consultation urgente'), prefs, NOW)
+
+def test_missing_fields_only_rejected_when_strict():
+    prefs = preferences(types=['urgent'], time_window=['08:00', '18:00'], max_distance_km=10)
+    assert matches_preferences(slot(), prefs, NOW)
+    assert not matches_preferences(slot(), dict(prefs, strict=True), NOW)
+
+def test_time_window_accepts_single_digit_hours():
+    prefs = preferences(time_window=['8:00', '18:00'])
+    assert matches_preferences(slot(NOW.replace(hour=8)), prefs, NOW)
+    assert matches_preferences(slot(NOW.replace(hour=18)), prefs, NOW)
+    assert not matches_preferences(slot(NOW.replace(hour=7, minute=59)), prefs, NOW)
+
+def test_time_window_wrapping_past_midnight():
+    prefs = preferences(time_window=['22:00', '06:00'])
+    assert matches_preferences(slot(NOW.replace(hour=23)), prefs, NOW)
+    assert matches_preferences(slot(NOW.replace(hour=5)), prefs, NOW)
+    assert not matches_preferences(slot(NOW.replace(hour=12)), prefs, NOW)
+
+def test_max_hours_ahead_and_distance():
+    prefs = preferences(max_hours_ahead=24, max_distance_km=10)
+    assert matches_preferences(slot(NOW + timedelta(hours=2), distance=5), prefs, NOW)
+    assert not matches_preferences(slot(NOW + timedelta(hours=30), distance=5), prefs, NOW)
+    assert not matches_preferences(slot(NOW + timedelta(hours=2), distance=12), prefs, NOW)
+
+def test_parse_start_converts_offsets_to_local_time():
+    expected = datetime(2026, 3, 10, 14, 30, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    assert parse_start('2026-03-10T14:30:00Z') == expected
+    assert parse_start('2026-03-10T10:30:00-04:00') == expected
+    assert parse_start('2026-03-10T14:30:00') == datetime(2026, 3, 10, 14, 30)
+
+def test_parse_start_time_only_is_next_occurrence():
+    assert parse_start('Disponible à 14h30', NOW) == datetime(2026, 3, 10, 14, 30)
+    assert parse_start('Disponible à 8:15', NOW) == datetime(2026, 3, 11, 8, 15)
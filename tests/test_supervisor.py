@@ -0,0 +1,55 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from checkpoints import PageChanged, SessionExpired, SlotExpired, SlotNotWanted
+from settings import DEFAULT_SETTINGS
+from supervisor import Supervisor, classify_failure, state_listeners
+
+def make_supervisor(**overrides):
+    return Supervisor('Test', dict(DEFAULT_SETTINGS['supervisor'], jitter=0, **overrides))
+
+def test_classify_failure():
+    assert classify_failure(SlotExpired('timer expired')) == 'restart'
+    assert classify_failure(SlotNotWanted('slot not wanted')) == 'unwanted'
+    assert classify_failure(SessionExpired('back on the identity form')) == 'session'
+    assert classify_failure(PageChanged('unknown page')) == 'selector'
+    assert classify_failure(TimeoutError('Timeout 5000ms exceeded waiting for locator("#confirm")')) == 'selector'
+    assert classify_failure(Exception('page.goto: net::ERR_CONNECTION_RESET')) == 'transient'
+    assert classify_failure(Exception('anything else')) == 'transient'
+
+def test_backoff_doubles_up_to_the_max_delay():
+    supervisor = make_supervisor(max_delay=30)
+    delays = [supervisor.failed(Exception(f'error {letter}'), 'results') for letter in 'abcde']
+    assert delays == [5, 10, 20, 30, 30]
+    supervisor.succeeded()
+    assert supervisor.failed(Exception('error f'), 'results') == 5
+
+def test_restarts_are_not_failures():
+    supervisor = make_supervisor()
+    assert supervisor.failed(SlotExpired('timer expired'), 'results') == 0
+    assert supervisor.failed(SlotNotWanted('slot not wanted'), 'results') == 60
+    assert supervisor.failures == 0
+
+def test_circuit_opens_on_identical_failures_and_closes_on_success():
+    events = []
+    listener = lambda provider, state, detail: events.append((provider, state))
+    state_listeners.append(listener)
+    try:
+        supervisor = make_supervisor(breaker_threshold=3, breaker_cooldown=600)
+        # Numbers in the message do not make it a different failure
+        delays = [supervisor.failed(PageChanged(f'button #{attempt} missing'), 'criteria') for attempt in range(3)]
+        assert delays[-1] == 600
+        assert events == [('Test', 'open')]
+        supervisor.succeeded()
+        assert events == [('Test', 'open'), ('Test', 'closed')]
+        assert supervisor.open_until is None
+    finally:
+        state_listeners.remove(listener)
+
+def test_circuit_stays_closed_when_the_failures_differ():
+    supervisor = make_supervisor(breaker_threshold=2, max_delay=600)
+    supervisor.failed(PageChanged('unknown page'), 'criteria')
+    supervisor.failed(PageChanged('unknown page'), 'identity')
+    assert supervisor.open_until is None
@@ -0,0 +1,110 @@
+import inspect
+import random
+import time
+from contextlib import contextmanager
+from logger import log_message
+
+class WaitPolicy:
+    """
+    Central place for every wait of a provider flow.
+
+    Steps wait for a condition (a selector, a load state) within a
+    per-step budget taken from the "waits" settings, instead of sleeping for a
+    fixed time. Fixed delays only remain as named politeness delays, also read
+    from the settings. Time spent waiting and working is recorded per step so
+    each polling cycle can report where its time went.
+    """
+
+    def __init__(self, provider, settings, testing_mode=False, testing_delay=0):
+        waits = settings['waits']
+        self.provider = provider
+        self.budgets = waits['budgets']
+        self.delays = waits['delays']
+        self.log_timing = waits['log_cycle_timing']
+        self.testing_mode = testing_mode
+        self.testing_delay = testing_delay
+        self.cycle_listeners = []  # called (or awaited) with the cycle label when a cycle ends
+        self.reset_cycle()
+
+    def reset_cycle(self):
+        self.cycle_started = time.monotonic()
+        self.waited = 0.0
+        self.steps = {}  # step name -> [wait seconds, work seconds]
+
+    def budget(self, step):
+        """Timeout in ms for `step`, falling back to the default budget"""
+        return self.budgets.get(step, self.budgets['default'])
+
+    def delay(self, name):
+        """Politeness delay in ms; a [min, max] setting picks a random value"""
+        value = self.delays.get(name, 0)
+        if isinstance(value, (list, tuple)):
+            value = random.randint(value[0], value[1])
+        if name == 'action' and self.testing_mode:
+            # Testing mode slows every action down to watch the browser
+            value = max(value, self.testing_delay)
+        return value
+
+    @contextmanager
+    def step(self, name):
+        """Time a step; waits made inside it count as waiting, the rest as work"""
+        started = time.monotonic()
+        waited_before = self.waited
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            waited = self.waited - waited_before
+            totals = self.steps.setdefault(name, [0.0, 0.0])
+            totals[0] += waited
+            totals[1] += max(elapsed - waited, 0.0)
+
+    @contextmanager
+    def waiting(self):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.waited += time.monotonic() - started
+
+    async def wait_for(self, locator, step, state='visible'):
+        """Wait for a locator to reach `state` within the budget of `step`"""
+        with self.waiting():
+            await locator.wait_for(state=state, timeout=self.budget(step))
+
+    async def wait_for_selector(self, page, selector, step, state='visible'):
+        with self.waiting():
+            return await page.wait_for_selector(selector, state=state, timeout=self.budget(step))
+
+    async def wait_for_load(self, page, step, state='domcontentloaded'):
+        with self.waiting():
+            await page.wait_for_load_state(state, timeout=self.budget(step))
+
+    async def goto(self, page, url, step='navigation', wait_until='domcontentloaded'):
+        with self.waiting():
+            return await page.goto(url, timeout=self.budget(step), wait_until=wait_until)
+
+    async def pause(self, page, name):
+        """Sleep for the named politeness delay, if it is configured"""
+        ms = self.delay(name)
+        if ms > 0:
+            with self.waiting():
+                await page.wait_for_timeout(ms)
+
+    async def end_cycle(self, label='Cycle'):
+        """Log how much of the cycle was waiting and how much was work, then start a new one"""
+        if self.log_timing:
+            elapsed = time.monotonic() - self.cycle_started
+            work = max(elapsed - self.waited, 0.0)
+            breakdown = ", ".join(
+                f"{name} {wait:.1f}s/{work_time:.1f}s"
+                for name, (wait, work_time) in self.steps.items()
+            )
+            log_message(f"[{self.provider}] {label} {elapsed:.1f}s: waiting {self.waited:.1f}s, work {work:.1f}s"
+                        + (f" (wait/work: {breakdown})" if breakdown else ""),
+                        stage=label.lower(), duration=round(elapsed, 3))
+        for listener in self.cycle_listeners:
+            result = listener(label)
+            if inspect.isawaitable(result):
+                await result
+        self.reset_cycle()
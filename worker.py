@@ -0,0 +1,191 @@
+import multiprocessing
+import queue
+import threading
+from logger import log_message
+from cancellation import CancelToken
+
+# Events sent by the worker, as (kind, data):
+#   ('status', (state, search)) with state 'running' | 'paused' | 'stopped' | 'idle', for the search
+#     started with that 'search' id; SearchWorker.poll passes on ('status', state), or 'crashed'
+#   ('log', logger.LogRecord)
+#   ('slot', provider key)
+#   ('provider', (provider, 'open' | 'closed', detail)) when a provider's circuit opens or closes
+# Commands sent to the worker, as (command, payload): start, stop, pause, resume, status, quit
+
+STOP_JOIN_TIMEOUT = 5  # seconds to wait for a cancelled search to close its browser
+MAX_RESTART_DELAY = 60  # seconds between restarts of an engine that keeps crashing
+
+def run_search(payload, search_running, events):
+    import browser
+    import logger
+    from settings import load_settings
+    logger.start_file_sink(load_settings(payload['config'])['logging'], 'search')
+    browser.set_testing_mode(payload['testing_mode'])
+    search = payload.get('search')
+    events.put(('status', ('running', search)))
+    failures = 0
+    try:
+        while search_running.get():
+            try:
+                browser.run_providers(payload['providers'], payload['config'], search_running, payload['autobook'],
+                                      payload['headless'])
+                failures = 0
+            except Exception as e:
+                # Failures inside a provider are handled by its supervisor, this is the engine itself failing
+                failures += 1
+                delay = min(MAX_RESTART_DELAY, 2 ** failures)
+                log_message(f"Error: {str(e)}, restarting in {delay}s")
+                search_running.sleep(delay)
+    finally:
+        search_running.set(False)
+        events.put(('status', ('stopped', search)))
+
+def worker_main(commands, events):
+    """
+    Entry point of the worker process.
+
+    Searches run on a thread of the worker so the command loop can always
+    take a stop, which cancels the search through its token and joins it;
+    log lines and slots are forwarded to the GUI as events.
+    """
+    import logger
+    import flows
+    import supervisor
+    from screenshots import writer
+    logger.listeners.append(lambda record: events.put(('log', record)))
+    flows.slot_listeners.append(lambda provider, booking: events.put(('slot', provider)))
+    supervisor.state_listeners.append(lambda *state: events.put(('provider', state)))
+
+    token = CancelToken()
+    token.cancel()
+    search = None
+    search_id = None  # id of the last search started, tagging its status events
+
+    def stop_search(timeout=STOP_JOIN_TIMEOUT):
+        token.cancel()
+        if search is not None:
+            search.join(timeout)
+
+    while True:
+        command, payload = commands.get()
+        if command == 'start':
+            # Never leave a previous search running next to the new one
+            stop_search()
+            # A fresh token, a search that did not finish in time must stay cancelled
+            token = CancelToken()
+            search_id = payload.get('search')
+            search = threading.Thread(target=run_search, args=(payload, token, events), name='search', daemon=True)
+            search.start()
+        elif command == 'stop':
+            stop_search()
+        elif command == 'pause':
+            token.pause()
+            events.put(('status', (token.state, search_id)))
+        elif command == 'resume':
+            token.resume()
+            events.put(('status', (token.state, search_id)))
+        elif command == 'status':
+            running = search is not None and search.is_alive()
+            events.put(('status', (token.state if running else 'idle', search_id)))
+        elif command == 'quit':
+            stop_search(payload or STOP_JOIN_TIMEOUT)
+            # The screenshots are written by a daemon thread, let it finish before the process exits
+            writer.wait()
+            break
+
+class SearchWorker:
+    """
+    GUI side of the search worker process.
+
+    The browser automation runs in a child process so it never shares the
+    interpreter with the render loop, and a crashed browser or worker cannot
+    take the window down. The worker is started on demand and started again
+    after it died, without restarting the app.
+    """
+
+    MAX_EVENTS_PER_POLL = 100  # keep a frame short even after a burst of log lines
+
+    def __init__(self):
+        # spawn everywhere: same behaviour on Windows, macOS and Linux, and no forked pygame state
+        self.mp = multiprocessing.get_context('spawn')
+        self.process = None
+        self.commands = None
+        self.events = None
+        self.searching = False
+        self.search_id = 0  # id of the current search, a stopped one can still send late events
+
+    def is_alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def ensure_started(self):
+        if self.is_alive():
+            return
+        if self.process is not None:
+            log_message("[GUI] Restarting the search worker...")
+        self.commands = self.mp.Queue()
+        self.events = self.mp.Queue()
+        self.process = self.mp.Process(target=worker_main, args=(self.commands, self.events),
+                                       name='meulade-worker', daemon=True)
+        self.process.start()
+
+    def send(self, command, payload=None):
+        self.ensure_started()
+        self.commands.put((command, payload))
+
+    def start_search(self, config, providers, autobook, testing_mode):
+        self.searching = True
+        self.search_id += 1
+        self.send('start', {'config': config, 'providers': providers, 'autobook': autobook,
+                            'testing_mode': testing_mode, 'headless': False, 'search': self.search_id})
+
+    def stop_search(self):
+        if self.is_alive():
+            self.commands.put(('stop', None))
+
+    def pause_search(self):
+        if self.is_alive():
+            self.commands.put(('pause', None))
+
+    def resume_search(self):
+        if self.is_alive():
+            self.commands.put(('resume', None))
+
+    def poll(self):
+        """
+        Events received since the last call, without ever blocking the caller.
+
+        Status events are passed on as ('status', state), those of an earlier
+        search are dropped: a search that took long to stop must not report
+        'stopped' while the next one runs.
+        """
+        received = []
+        if self.events is None:
+            return received
+        for _ in range(self.MAX_EVENTS_PER_POLL):
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+            except (EOFError, OSError):
+                break
+            if event[0] == 'status':
+                state, search = event[1]
+                if search != self.search_id:
+                    continue
+                if state == 'stopped':
+                    self.searching = False
+                event = ('status', state)
+            received.append(event)
+        if self.searching and not self.is_alive():
+            self.searching = False
+            received.append(('status', 'crashed'))
+        return received
+
+    def shutdown(self, timeout=5):
+        """Stop the search, let the worker close the browser, then make sure it is gone"""
+        if not self.is_alive():
+            return
+        self.commands.put(('quit', timeout))
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()